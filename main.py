@@ -1,5 +1,16 @@
+import sys
 import asyncio
 from src.game import Game
 
 if __name__ == "__main__":
-    asyncio.run(Game().run())
+    renderer = "gpu" if "--gpu" in sys.argv else "software" if "--gpu-software" in sys.argv else "surface"
+    asyncio.run(
+        Game(
+            profile="--startup-profile" in sys.argv,
+            pipelined="--pipelined" in sys.argv,
+            renderer=renderer,
+            horde="--horde" in sys.argv,
+            record="--record" in sys.argv,
+            costs="--frame-costs" in sys.argv,
+        ).run()
+    )
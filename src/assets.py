@@ -0,0 +1,245 @@
+import sys
+import pygame
+from time import perf_counter
+from math import hypot
+from threading import Lock
+from concurrent.futures import ThreadPoolExecutor
+from src.const import IMAGES, SOUNDS, FONTS, BUNDLE
+
+
+def mask_bounds(mask: pygame.mask.Mask) -> pygame.Rect:
+    """
+    Get the smallest rect containing every set pixel of a mask
+
+    :param mask: pygame.mask.Mask, The mask
+    :return: pygame.Rect, The bounds (empty if nothing is set)
+    """
+    rects = mask.get_bounding_rects()
+    return rects[0].unionall(rects[1:]) if len(rects) > 0 else pygame.Rect(0, 0, 0, 0)
+
+
+def bounding_radius(bounds: pygame.Rect, size: tuple[int, int]) -> float:
+    """
+    Get the radius of a circle around the center of an image containing its bounds
+    It doesn't change when the image is rotated around its center
+
+    :param bounds: pygame.Rect, The bounds of the set pixels
+    :param size: tuple[int, int], The size of the image
+    :return: float, The radius
+    """
+    if bounds.width == 0 or bounds.height == 0:
+        return 0
+    center_x, center_y = size[0] / 2, size[1] / 2
+    corners = [(x, y) for x in (bounds.left, bounds.right) for y in (bounds.top, bounds.bottom)]
+    return max(hypot(x - center_x, y - center_y) for x, y in corners)
+
+
+class Assets:
+    """
+    The Assets keep decoded images, sounds and fonts so each file is only loaded once
+    They can be decoded in worker threads and preloaded a few at a time, to spread the work across frames
+    They are taken from the packed bundle when there is one, else from their own files
+    """
+
+    def __init__(self):
+        self.bundle = None
+        try:
+            from src.bundle import Bundle
+
+            self.bundle = Bundle(BUNDLE)
+        except Exception:
+            self.bundle = None
+
+        self.cache = {"image": {}, "sound": {}, "font": {}}
+        self.masks: dict[str, pygame.mask.Mask] = {}
+        self.radii: dict[str, float] = {}
+        self.rotations: dict[tuple[str, int, int], pygame.Surface] = {}
+        self.queue = (
+            [("image", name) for name in IMAGES]
+            + [("sound", name) for name in SOUNDS]
+            + [("font", font) for font in FONTS]
+        )
+        # Time (ms) spent decoding each asset
+        self.timings: dict[tuple, float] = {}
+
+        self.pool = None
+        self.futures = {}
+        self.font_lock = Lock()
+
+    @property
+    def loaded(self) -> bool:
+        """
+        Check if every known asset is loaded
+
+        :return: bool, Whether there is nothing left to preload or not
+        """
+        return len(self.queue) == 0
+
+    def bundled(self, path: str) -> bool:
+        """
+        Check if a file is in the bundle
+
+        :param path: str, The path of the file inside assets/
+        :return: bool, Whether the file can be taken from the bundle or not
+        """
+        return self.bundle is not None and path in self.bundle
+
+    def decode(self, kind: str, key) -> object:
+        """
+        Decode an asset, this can run in a worker thread
+
+        :param kind: str = "image" | "sound" | "font", The kind of the asset
+        :param key: str | tuple[str, int], The filename (and size for fonts)
+        :return: pygame.Surface | pygame.mixer.Sound | pygame.font.Font, The decoded asset
+        """
+        start = perf_counter()
+        if kind == "image":
+            if self.bundled(key):
+                value = self.bundle.image(key)
+            else:
+                value = pygame.image.load(f"assets/images/{key}")
+        elif kind == "sound":
+            path = f"sounds/{key}.ogg"
+            value = pygame.mixer.Sound(self.bundle.stream(path) if self.bundled(path) else f"assets/{path}")
+        else:
+            name, size = key
+            path = f"fonts/{name}"
+            # FreeType can't open faces from several threads at once
+            with self.font_lock:
+                value = pygame.font.Font(self.bundle.stream(path) if self.bundled(path) else f"assets/{path}", size)
+        self.timings[(kind, key)] = (perf_counter() - start) * 1000
+        return value
+
+    def get(self, kind: str, key) -> object:
+        """
+        Get an asset from the cache, decoding it if needed
+
+        :param kind: str = "image" | "sound" | "font", The kind of the asset
+        :param key: str | tuple[str, int], The filename (and size for fonts)
+        :return: pygame.Surface | pygame.mixer.Sound | pygame.font.Font, The asset
+        """
+        cache = self.cache[kind]
+        if key not in cache:
+            future = self.futures.pop((kind, key), None)
+            value = future.result() if future is not None else self.decode(kind, key)
+            # Conversion needs the display, so it always happens on the main thread
+            if kind == "image" and not self.bundled(key):
+                value = value.convert_alpha()
+            cache[key] = value
+        return cache[key]
+
+    def image(self, name: str) -> pygame.Surface:
+        """
+        Get an image, it must not be modified as it is shared
+
+        :param name: str, The filename of the image
+        :return: pygame.Surface, The image
+        """
+        return self.get("image", name)
+
+    def mask(self, name: str) -> pygame.mask.Mask:
+        """
+        Get the mask of an image, it must not be modified as it is shared
+
+        :param name: str, The filename of the image
+        :return: pygame.mask.Mask, The mask of the image
+        """
+        if name not in self.masks:
+            if self.bundled(name):
+                self.masks[name] = self.bundle.mask(name)
+            else:
+                self.masks[name] = pygame.mask.from_surface(self.image(name))
+        return self.masks[name]
+
+    def radius(self, name: str) -> float:
+        """
+        Get the bounding radius of an image, around its center
+
+        :param name: str, The filename of the image
+        :return: float, The bounding radius of the image
+        """
+        if name not in self.radii:
+            if self.bundled(name):
+                self.radii[name] = bounding_radius(self.bundle.bounds(name), self.bundle.index[name]["size"])
+            else:
+                mask = self.mask(name)
+                self.radii[name] = bounding_radius(mask_bounds(mask), mask.get_size())
+        return self.radii[name]
+
+    def rotation(self, name: str, index: int, steps: int) -> pygame.Surface:
+        """
+        Get a rotated image from the rotation atlas, it must not be modified as it is shared
+        Rotations go clockwise, they are taken from the bundle when it has the same number of steps
+
+        :param name: str, The filename of the image
+        :param index: int, The index of the rotation
+        :param steps: int, The number of rotations in a full turn
+        :return: pygame.Surface, The rotated image
+        """
+        key = (name, index, steps)
+        if key not in self.rotations:
+            frames = self.bundle.rotations(name) if self.bundled(name) else []
+            if len(frames) == steps:
+                self.rotations[key] = self.bundle.image(frames[index])
+            else:
+                self.rotations[key] = pygame.transform.rotate(self.image(name), -360 * index / steps)
+        return self.rotations[key]
+
+    def sound(self, name: str) -> pygame.mixer.Sound:
+        """
+        Get a sound
+
+        :param name: str, The filename of the sound (without extension)
+        :return: pygame.mixer.Sound, The sound
+        """
+        return self.get("sound", name)
+
+    def font(self, name: str, size: int) -> pygame.font.Font:
+        """
+        Get a font at the given size
+
+        :param name: str, The filename of the font
+        :param size: int, The size of the font
+        :return: pygame.font.Font, The font
+        """
+        return self.get("font", (name, size))
+
+    def start(self, workers: int = None):
+        """
+        Start decoding every queued asset in worker threads
+        pygame releases the GIL while decoding, so they really run in parallel
+        Nothing happens under emscripten where there are no threads, assets are then preloaded one by one
+
+        :param workers: int = None, The number of threads to use (depends on the CPU by default)
+        """
+        if sys.platform == "emscripten" or self.pool is not None:
+            return
+        self.pool = ThreadPoolExecutor(workers, thread_name_prefix="assets")
+        for kind, key in self.queue:
+            self.futures[(kind, key)] = self.pool.submit(self.decode, kind, key)
+
+    def preload(self, budget: float):
+        """
+        Finish loading queued assets until the time budget is spent
+        Assets still decoding in a worker thread are left for later
+
+        :param budget: float, The time (ms) we can spend loading
+        """
+        start = perf_counter()
+        for kind, key in list(self.queue):
+            if (perf_counter() - start) * 1000 >= budget:
+                break
+            future = self.futures.get((kind, key))
+            if future is not None and not future.done():
+                continue
+            self.queue.remove((kind, key))
+            try:
+                self.get(kind, key)
+            except pygame.error:
+                # Missing audio device for instance, it will be tried again on use
+                pass
+        if self.loaded and self.pool is not None:
+            self.pool.shutdown(wait=False)
+
+
+assets = Assets()
@@ -0,0 +1,204 @@
+import io
+import os
+import sys
+import json
+import mmap
+import struct
+import pygame
+from src.assets import mask_bounds
+from src.const import IMAGES, SOUNDS, FONTS, BUNDLE
+
+MAGIC = b"OMGB"
+HEADER = struct.Struct("<4sI")
+ALIGN = 16
+
+
+def stamp(path: str) -> list[int]:
+    """
+    Get what tells whether a source file changed, its size and modification time
+
+    :param path: str, The path of the file
+    :return: list[int], The size and modification time (ns) of the file
+    """
+    stats = os.stat(path)
+    return [stats.st_size, stats.st_mtime_ns]
+
+
+class Bundle:
+    """
+    The Bundle gives access to the assets packed in a single file
+    The file is memory-mapped, images are built on top of it without copying,
+    so only the parts actually used are read and they can be shared between processes
+    Assets whose source file changed since they were packed are left out, so they are loaded from their files
+
+    :param path: str, The path of the bundle
+    """
+
+    def __init__(self, path: str):
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.map)
+        magic, length = HEADER.unpack_from(self.map)
+        if magic != MAGIC:
+            raise ValueError(f"'{path}' is not an asset bundle")
+        self.index = json.loads(bytes(self.view[HEADER.size : HEADER.size + length]))
+        # Offsets in the index are relative to the aligned end of the header
+        self.base = HEADER.size + length + -(HEADER.size + length) % ALIGN
+
+        stale = [name for name, entry in self.index.items() if "source" in entry and self.changed(entry["source"])]
+        for name in stale:
+            for frame in self.index[name].get("rotations", []):
+                del self.index[frame]
+            del self.index[name]
+        if len(stale) > 0:
+            print(f"Assets changed since '{path}' was packed, they are loaded from their files: {', '.join(stale)}")
+
+    @staticmethod
+    def changed(source: list) -> bool:
+        """
+        Check if a source file changed since it was packed, a missing file can't replace the packed one
+
+        :param source: list, The path, size and modification time (ns) of the file when it was packed
+        :return: bool, Whether the file changed or not
+        """
+        path, *packed = source
+        return os.path.exists(path) and stamp(path) != packed
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.index
+
+    def chunk(self, offset: int, length: int) -> memoryview:
+        """
+        Get a chunk of the bundle without copying it
+
+        :param offset: int, The offset of the chunk
+        :param length: int, The length of the chunk
+        :return: memoryview, The chunk
+        """
+        return self.view[self.base + offset : self.base + offset + length]
+
+    def image(self, name: str) -> pygame.Surface:
+        """
+        Get an image, backed by the bundle so it must never be modified
+
+        :param name: str, The name of the image
+        :return: pygame.Surface, The image
+        """
+        entry = self.index[name]
+        width, height = entry["size"]
+        return pygame.image.frombuffer(self.chunk(entry["pixels"], width * height * 4), (width, height), "BGRA")
+
+    def mask(self, name: str) -> pygame.mask.Mask:
+        """
+        Get the precomputed mask of an image
+
+        :param name: str, The name of the image
+        :return: pygame.mask.Mask, The mask
+        """
+        entry = self.index[name]
+        width, height = entry["size"]
+        plane = pygame.image.frombuffer(self.chunk(entry["mask"], width * height), (width, height), "P")
+        plane.set_colorkey(0)
+        return pygame.mask.from_surface(plane)
+
+    def bounds(self, name: str) -> pygame.Rect:
+        """
+        Get the precomputed bounds of the set pixels of an image
+
+        :param name: str, The name of the image
+        :return: pygame.Rect, The bounds
+        """
+        return pygame.Rect(self.index[name]["bounds"])
+
+    def rotations(self, name: str) -> list[str]:
+        """
+        Get the names of the pre-rotated frames of an image
+
+        :param name: str, The name of the image
+        :return: list[str], The names of the frames, evenly spread clockwise from 0°
+        """
+        return self.index[name].get("rotations", [])
+
+    def stream(self, name: str) -> io.BytesIO:
+        """
+        Get a packed file, to load sounds and fonts from
+
+        :param name: str, The name of the file
+        :return: io.BytesIO, The content of the file
+        """
+        entry = self.index[name]
+        return io.BytesIO(self.chunk(entry["offset"], entry["length"]))
+
+    def close(self):
+        """
+        Close the bundle, every image built from it becomes invalid
+        """
+        self.view.release()
+        self.map.close()
+        self.file.close()
+
+
+def pack(path: str, rotations: int = 0):
+    """
+    Pack the game assets in a bundle
+    Images are stored as raw BGRA pixels with a mask plane (one byte per pixel),
+    sounds and fonts are stored as they are, the size and modification time of every source file are kept
+
+    :param path: str, The path of the bundle to create
+    :param rotations: int = 0, The number of pre-rotated frames to bake for each image
+    """
+    index = {}
+    chunks = []
+    offset = 0
+
+    def add(data: bytes) -> int:
+        nonlocal offset
+        start = offset
+        padding = -len(data) % ALIGN
+        chunks.append(data + bytes(padding))
+        offset += len(data) + padding
+        return start
+
+    def add_image(name: str, image: pygame.Surface):
+        mask = pygame.mask.from_surface(image)
+        # Keep the red channel of the white on black mask, so there is one byte per pixel
+        plane = pygame.image.tobytes(mask.to_surface(), "RGBA")[::4]
+        index[name] = {
+            "kind": "image",
+            "size": image.get_size(),
+            "pixels": add(pygame.image.tobytes(image, "BGRA")),
+            "mask": add(plane),
+            "bounds": tuple(mask_bounds(mask)),
+        }
+
+    for name in IMAGES:
+        image = pygame.image.load(f"assets/images/{name}")
+        add_image(name, image)
+        index[name]["source"] = [f"assets/images/{name}", *stamp(f"assets/images/{name}")]
+        if rotations > 0:
+            index[name]["rotations"] = [f"{name}@{i}" for i in range(rotations)]
+            for i in range(rotations):
+                add_image(f"{name}@{i}", pygame.transform.rotate(image, -360 * i / rotations))
+    fonts = sorted({name for name, _ in FONTS})
+    for path_name in [f"sounds/{name}.ogg" for name in SOUNDS] + [f"fonts/{name}" for name in fonts]:
+        with open(f"assets/{path_name}", "rb") as file:
+            data = file.read()
+        index[path_name] = {
+            "kind": "file",
+            "offset": add(data),
+            "length": len(data),
+            "source": [f"assets/{path_name}", *stamp(f"assets/{path_name}")],
+        }
+
+    header = json.dumps(index).encode()
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, len(header)))
+        file.write(header)
+        file.write(bytes(-(HEADER.size + len(header)) % ALIGN))
+        for chunk in chunks:
+            file.write(chunk)
+
+
+if __name__ == "__main__":
+    # python -m src.bundle [rotations]
+    pack(BUNDLE, int(sys.argv[1]) if len(sys.argv) > 1 else 0)
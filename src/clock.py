@@ -0,0 +1,40 @@
+from time import time
+
+
+class Clock:
+    """
+    The Clock gives the time the game objects live by, the real time by default
+    It can be simulated instead, then only moving forward with the engine,
+    so games can run faster than real time and be played again exactly
+    """
+
+    def __init__(self):
+        self.simulated = None
+
+    def time(self) -> float:
+        """
+        Get the current time
+
+        :return: float, The time (s)
+        """
+        return time() if self.simulated is None else self.simulated
+
+    def simulate(self, start: float = 1000):
+        """
+        Start simulating the time
+
+        :param start: float = 1000, The time (s) to start at, late enough for cooldowns never started (at 0) to be over
+        """
+        self.simulated = start
+
+    def advance(self, dt: int):
+        """
+        Move the simulated time forward, nothing happens with the real time
+
+        :param dt: int, The time delta between frames
+        """
+        if self.simulated is not None:
+            self.simulated += dt / 1000
+
+
+clock = Clock()
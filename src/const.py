@@ -61,3 +61,115 @@ ENEMY_NUMBER = {
     "CommandShip": [1, 2, 3, 4, 5],
     "DeathShip": [0, 1, 1, 1, 2],
 }
+
+# SCORES
+LEADERBOARD_CAPACITY = 1000
+SCORES_ROWS = 10
+# Number of scores fetched at once from the remote database around the rows shown
+SCORES_PAGE = 100
+# Time (s) the rows shown must stay still before a page is fetched
+SCORES_DEBOUNCE = 0.25
+
+# ASSETS
+IMAGES = [
+    "PlayerShell.png",
+    "PlayerDetails1.png",
+    "PlayerDetails2.png",
+    "DroidShip.png",
+    "CommandShip.png",
+    "DeathShip.png",
+    "Transformation1.png",
+    "Transformation2.png",
+    "PhotonMine.png",
+    "VaporMine.png",
+    *[f"Explosion{step}.png" for step in range(1, 7)],
+]
+SOUNDS = ["Laser", "Explosion"]
+FONTS = [("font.ttf", 25), ("font.ttf", 40), ("font.ttf", 90)]
+BUNDLE = "assets/bundle.bin"
+
+# SIMULATION
+TICK_RATE = 120
+TICK = 1000 / TICK_RATE
+MAX_FRAME = 250
+
+# LAYERS
+LASERS = 0
+MINES = 1
+ENEMIES = 2
+PLAYER = 3
+EXPLOSIONS = 4
+FORCE_FIELD = 5
+
+# THROTTLING
+IDLE_DELAY = 5
+IDLE_FPS = 20
+UNFOCUSED_FPS = 10
+
+# QUALITY
+# Each level gives up a bit more quality, to keep up with the frame rate on slow computers
+QUALITY_LEVELS = [
+    ("full quality", {"stars": 128, "smooth": True, "explosion_step": 1, "rotations": 0}),
+    ("fewer stars", {"stars": 64, "smooth": True, "explosion_step": 1, "rotations": 0}),
+    ("fast scaling", {"stars": 64, "smooth": False, "explosion_step": 1, "rotations": 0}),
+    ("shorter explosions", {"stars": 32, "smooth": False, "explosion_step": 2, "rotations": 0}),
+    ("rotations by steps", {"stars": 32, "smooth": False, "explosion_step": 2, "rotations": 64}),
+    ("rotations by big steps", {"stars": 16, "smooth": False, "explosion_step": 2, "rotations": 32}),
+]
+QUALITY_DOWN = 0.9
+QUALITY_UP = 0.5
+QUALITY_COOLDOWN = 2
+QUALITY_RECOVERY = 5
+
+# EFFECTS
+EXPLOSION = [f"Explosion{step}.png" for step in range(1, 7)]
+# Time (ms) each image of an animation is shown
+FRAME_DURATION = 100
+EFFECTS_CAPACITY = 64
+
+# HORDE
+# Enemies of each type at a given level in horde mode: base * growth ** (level - 1), up to HORDE_MAX
+HORDE = {
+    "DroidShip": (200, 1.5),
+    "CommandShip": (40, 1.5),
+    "DeathShip": (8, 1.5),
+}
+HORDE_MAX = 5000
+# Parts of a frame whose cost is measured
+COSTS = ["player", "enemies", "ai", "mines", "lasers", "explosions", "force field", "draw"]
+
+# AI
+# Ships think once every tick near the player, one tick less often for every AI_DISTANCE pixels further
+AI_DISTANCE = 150
+# Ticks in the schedule, the longest time (in ticks) a ship can go without thinking
+AI_SLOTS = 8
+# Time (ms) ships can spend thinking in a tick, the others wait for the next one
+AI_BUDGET = 2
+
+# PATROL
+# Size (px) of the cells of the patrol grid, patrol distances are multiples of it
+PATROL_CELL = 10
+
+# SIGHT
+# Number of ships from which checking them all at once with NumPy is faster than one by one
+SIGHT_BATCH = 512
+# Distance (px) to the panel under which the rounding of clipline could change a batched answer
+SIGHT_MARGIN = 2
+
+# ANGLES
+# Headings in a full turn, rotation atlases must have a number of steps dividing it
+ANGLES = 4096
+
+# RECORDING
+# Where the games played with --record are saved
+RECORDINGS = "recordings"
+
+# ENV
+# Closest enemies, enemy lasers and mines seen by programs playing the game
+ENV_ENEMIES = 8
+ENV_LASERS = 4
+ENV_MINES = 4
+# Reward lost with each life
+ENV_LIFE_COST = 1000
+# Longest time (s) a game lasts before being cut
+ENV_LIMIT = 300
@@ -1,7 +1,93 @@
 import os
 import sys
 from time import time
+from heapq import merge
+from bisect import bisect_right
 from src.thread import Thread
+from src.const import LEADERBOARD_CAPACITY, SCORES_PAGE, SCORES_DEBOUNCE
+
+
+class Leaderboard:
+    """
+    The Leaderboard keeps the best scores sorted as they come in
+    Scores are stored by decreasing value, equal scores keep their arrival order
+
+    :param capacity: int, The maximum number of scores to keep
+    """
+
+    def __init__(self, capacity: int = LEADERBOARD_CAPACITY):
+        self.capacity = capacity
+        # Negated scores, so bisect can work on an ascending list
+        self.keys: list[int] = []
+        self.docs: list[dict] = []
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def __getitem__(self, index):
+        return self.docs[index]
+
+    def __iter__(self):
+        return iter(self.docs)
+
+    @property
+    def lowest(self) -> int:
+        """
+        Get the lowest score kept in the leaderboard
+
+        :return: int, The lowest score (0 if empty)
+        """
+        return self.docs[-1]["score"] if len(self.docs) > 0 else 0
+
+    def qualifies(self, score: int) -> bool:
+        """
+        Check if a score would enter the leaderboard
+
+        :param score: int, The score to check
+        :return: bool, Whether the score would be kept or not
+        """
+        return len(self.docs) < self.capacity or score > self.lowest
+
+    def insert(self, doc: dict) -> int:
+        """
+        Insert a score document at its place
+
+        :param doc: dict, The document to insert (needs a "score" key)
+        :return: int, The rank of the document, None if it didn't qualify
+        """
+        if not self.qualifies(doc["score"]):
+            return None
+        index = bisect_right(self.keys, -doc["score"])
+        self.keys.insert(index, -doc["score"])
+        self.docs.insert(index, doc)
+        if len(self.docs) > self.capacity:
+            self.keys.pop()
+            self.docs.pop()
+        return index
+
+    def remove(self, doc: dict):
+        """
+        Remove a score document from the leaderboard
+
+        :param doc: dict, The document to remove
+        """
+        index = self.docs.index(doc)
+        del self.keys[index]
+        del self.docs[index]
+
+    def replace(self, *sorted_docs):
+        """
+        Replace the content with already sorted streams of documents
+        The streams are merged lazily, only the kept documents are visited
+
+        :param sorted_docs: Iterable[dict], Streams sorted by decreasing score
+        """
+        self.keys, self.docs = [], []
+        for doc in merge(*sorted_docs, key=lambda doc: doc["score"], reverse=True):
+            if len(self.docs) >= self.capacity:
+                break
+            self.keys.append(-doc["score"])
+            self.docs.append(doc)
 
 
 class Data:
@@ -9,9 +95,24 @@ class Data:
     The Database for scores
     """
 
-    def __init__(self):
+    def __init__(self, capacity: int = LEADERBOARD_CAPACITY):
         self.db = None
-        self.scores = []
+        self.scores = Leaderboard(capacity)
+        # Scores added locally that the remote database doesn't have yet, all of them are kept until pushed
+        self.pending = Leaderboard(sys.maxsize)
+        # Increased on every change, so screens know when to ask again
+        self.version = 0
+        # The window of scores last asked for and when, and the page around it fetched from the remote database
+        self.query = None
+        self.asked = 0
+        self.page_docs: list[dict] = None
+        self.page_start = 0
+        self.page_name = None
+        self.fetching = False
+        # The number of remote scores, only counted again when the name filter changes
+        self.counted = False
+        self.total_name = None
+        self.window_total = 0
         self.last_fetch = 0
         self.last_connection = 0
         self.connected = False
@@ -65,6 +166,8 @@ class Data:
             )
             self.db = client["Scores"]
             self.connected = True
+            # Scores made while offline
+            await self.push()
             await self.fetch()
         except Exception:
             self.connected = False
@@ -77,38 +180,123 @@ class Data:
             return
         self.last_fetch = time()
         try:
-            self.scores = [doc for doc in self.db["Single"].find()]
-            self.scores.sort(key=lambda doc: doc["score"], reverse=True)
+            cursor = self.db["Single"].find().sort("score", -1).limit(self.scores.capacity)
+            self.scores.replace(cursor, self.pending)
+            self.version += 1
         except Exception:
             self.connected = False
 
-    async def insert(self, doc: dict):
+    def covers(self, start: int, count: int, name: str = None) -> bool:
+        """
+        Check if the fetched page holds a window of scores
+
+        :param start: int, The rank of the first score
+        :param count: int, The number of scores
+        :param name: str = None, Only get the scores made by this user
+        :return: bool, Whether the window is in the page or not
         """
-        Try to insert a document in the remote database
+        if self.page_docs is None or self.page_name != name or start < self.page_start:
+            return False
+        # A short page reaches the last score
+        return start + count <= self.page_start + len(self.page_docs) or len(self.page_docs) < SCORES_PAGE
 
-        :param doc: dict, The document to insert
+    def can_fetch_window(self) -> bool:
+        """
+        Check if the page around the window last asked for should be fetched
+
+        :return: bool, Whether the window stayed still long enough outside of the page or not
+        """
+        return (
+            self.connected
+            and not self.fetching
+            and self.query is not None
+            and time() - self.asked > SCORES_DEBOUNCE
+            and not self.covers(*self.query)
+        )
+
+    async def fetch_window(self):
+        """
+        Try to fetch a page around the window of scores last asked for from the remote database
+        """
+        start, count, name = self.query
+        page_start = max(0, start - (SCORES_PAGE - count) // 2)
+        try:
+            condition = {} if name is None else {"name": name}
+            cursor = self.db["Single"].find(condition).sort("score", -1).skip(page_start).limit(SCORES_PAGE)
+            self.page_docs, self.page_start, self.page_name = list(cursor), page_start, name
+            if not self.counted or self.total_name != name:
+                self.window_total = self.db["Single"].count_documents(condition)
+                self.counted, self.total_name = True, name
+            self.version += 1
+        except Exception:
+            self.connected = False
+        finally:
+            self.fetching = False
+
+    async def push(self):
+        """
+        Try to insert the pending scores in the remote database
         """
         if not self.connected:
             return
         try:
-            self.db["Single"].insert_one(doc)
+            for doc in list(self.pending):
+                self.db["Single"].insert_one(doc)
+                self.pending.remove(doc)
+                # The page may have moved, it is fetched again when asked
+                self.page_docs = None
+                if self.counted and self.total_name in (None, doc["name"]):
+                    self.window_total += 1
         except Exception:
             self.connected = False
 
     def add_score(self, name: str, score: int, level: int):
         """
-        Add a score to the database locally (and try remotely)
+        Add a score to the database locally and remotely (later if offline)
 
         :param name: str, The name of the user who made the score
         :param score: int, The score made
         :param level: int, The level reached
         """
-        if len(self.scores) < 10 or score > self.scores[9]["score"]:
-            doc = {"name": name, "score": score, "level": level}
-            self.scores.append(doc)
-            self.scores.sort(key=lambda doc: doc["score"], reverse=True)
+        doc = {"name": name, "score": score, "level": level}
+        if self.scores.insert(doc) is not None:
+            self.version += 1
+        # Even scores too low to be kept locally are pushed, they have their rank remotely
+        self.pending.insert(doc)
+        Thread(self.push).start()
+
+    def window(self, start: int, count: int, name: str = None) -> list[dict]:
+        """
+        Get a window of the scores, sorted by decreasing score
+        When connected the window (and the name filter) is resolved by the remote database,
+        the local scores are used until a page holding it is fetched
+
+        :param start: int, The rank of the first score
+        :param count: int, The number of scores
+        :param name: str = None, Only get the scores made by this user
+        :return: list[dict], The scores in the window
+        """
+        if self.connected:
+            if (start, count, name) != self.query:
+                self.query = (start, count, name)
+                self.asked = time()
+            if self.covers(start, count, name):
+                return self.page_docs[start - self.page_start : start - self.page_start + count]
+        docs = self.scores if name is None else [doc for doc in self.scores if doc["name"] == name]
+        return docs[start : start + count]
 
-            Thread(self.insert, args=[doc]).start()
+    def total(self, name: str = None) -> int:
+        """
+        Get the number of scores, from the remote database when they were counted with the same filter
+
+        :param name: str = None, Only count the scores made by this user
+        :return: int, The number of scores
+        """
+        if self.connected and self.counted and self.total_name == name:
+            return self.window_total
+        if name is None:
+            return len(self.scores)
+        return sum(1 for doc in self.scores if doc["name"] == name)
 
     def update(self):
         """
@@ -116,3 +304,6 @@ class Data:
         """
         Thread(self.connect).start()
         Thread(self.fetch).start()
+        if self.can_fetch_window():
+            self.fetching = True
+            Thread(self.fetch_window).start()
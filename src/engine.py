@@ -1,8 +1,7 @@
 import pygame
-from time import time
+from time import perf_counter
 from random import randrange
-from src.thread import Timer
-from src.objects.base import Explosion
+from src.objects.base import Entity
 from src.objects.sprites import (
     Player,
     Ship,
@@ -12,7 +11,11 @@ from src.objects.sprites import (
     Mine,
     Laser,
 )
-from src.objects.graphics import ForceField
+from src.objects.graphics import ForceField, RenderList, Effects
+from src.scheduler import Scheduler
+from src.sight import sight
+from src.clock import clock
+from src.recording import Recorder
 from src.screens import Screen
 from src.config import Config
 from src.mixer import Mixer
@@ -25,6 +28,16 @@ from src.const import (
     PAUSE,
     GAMEOVER,
     ENEMY_NUMBER,
+    LASERS,
+    MINES,
+    ENEMIES,
+    PLAYER,
+    EXPLOSIONS,
+    FORCE_FIELD,
+    EXPLOSION,
+    HORDE,
+    HORDE_MAX,
+    COSTS,
 )
 
 
@@ -34,59 +47,120 @@ class Engine(Screen):
 
     :param config: Config, The game configuration
     :param mixer: Mixer, The game mixer for music and sounds
+    :param horde: bool = False, Whether to spawn hordes of enemies growing with each level or not
+    :param recorder: Recorder = None, Where to record the games, to play them again
     """
 
-    def __init__(self, config: Config, mixer: Mixer):
+    def __init__(self, config: Config, mixer: Mixer, horde: bool = False, recorder: Recorder = None):
         super().__init__(config, mixer)
+        self.horde = horde
+        self.recorder = recorder
+        # Where we are between the last two simulation steps, to interpolate positions
+        self.alpha = 1
+        self.render = RenderList(6, (LASERS, MINES, ENEMIES, PLAYER))
+        self.explosions = Effects(EXPLOSION)
+        self.render.add_batch(self.explosions, EXPLOSIONS)
+        self.ai = Scheduler()
+        if recorder is not None:
+            # Recorded games must not depend on the speed of the computer
+            self.ai.budget = float("inf")
+        # Time (s) spent in each part of the frames since the costs were last read
+        self.costs = dict.fromkeys(COSTS, 0.0)
+        self.phases = [
+            ("player", self.update_player),
+            ("enemies", self.update_enemies),
+            ("ai", self.update_ai),
+            ("mines", self.update_mines),
+            ("lasers", self.update_lasers),
+            ("explosions", self.update_explosions),
+            ("force field", self.update_force_field),
+        ]
 
     def start(self):
         """
         Completely start the game
         """
+        if self.recorder is not None:
+            if self.recorder.recording:
+                # The previous game was left unfinished
+                self.recorder.end(self.score, self.level)
+            self.recorder.begin(self.horde)
         self.level = 1
         self.lives = 3
         self.score = 0
+        # Ships and mines destroyed, by type
+        self.kills: dict[str, int] = {}
+        self.explosions.clear()
         self.restart()
 
     def restart(self):
         """
         Reset the game state, except for score and lives
         """
-        self.enemies: list[Ship] = (
-            [
-                DroidShip(
-                    randrange(300, WIN_WIDTH - 300),
-                    randrange(CEN_Y + PAN_HEIGHT // 2 + 50, WIN_HEIGHT - 50),
-                    self.level,
-                )
-                for i in range(ENEMY_NUMBER["DroidShip"][min(self.level - 1, 4)])
-            ]
-            + [
-                CommandShip(
-                    randrange(300, WIN_WIDTH - 300),
-                    randrange(CEN_Y + PAN_HEIGHT // 2 + 50, WIN_HEIGHT - 50),
-                    self.level,
-                )
-                for i in range(ENEMY_NUMBER["CommandShip"][min(self.level - 1, 4)])
-            ]
-            + [
-                DeathShip(
-                    randrange(300, WIN_WIDTH - 300),
-                    randrange(CEN_Y + PAN_HEIGHT // 2 + 50, WIN_HEIGHT - 50),
-                    self.level,
-                )
-                for i in range(ENEMY_NUMBER["DeathShip"][min(self.level - 1, 4)])
-            ]
-        )
+        # Ships alive, by type (dicts are used as ordered sets)
+        self.droids: dict[DroidShip, None] = {}
+        self.commanders: dict[CommandShip, None] = {}
+        self.deaths: dict[DeathShip, None] = {}
+        self.buckets: dict[type, dict[Ship, None]] = {
+            DroidShip: self.droids,
+            CommandShip: self.commanders,
+            DeathShip: self.deaths,
+        }
         self.mines: list[Mine] = []
         self.player_lasers: list[Laser] = []
         self.enemies_lasers: list[Laser] = []
-        self.explosions: list[Explosion] = []
         self.player = Player(self.config.color)
+        self.thrusting = False
+        # Inputs waiting for the next tick
+        self.inputs = None
 
         self.force_field = ForceField()
 
+        self.render.clear()
+        self.ai.clear()
+        for kind in self.buckets:
+            for i in range(self.enemy_number(kind.__name__)):
+                x = randrange(300, WIN_WIDTH - 300)
+                y = randrange(CEN_Y + PAN_HEIGHT // 2 + 50, WIN_HEIGHT - 50)
+                self.spawn(kind(x, y, self.level))
+        self.render.add(self.player, PLAYER)
+        self.render.add(self.force_field.composite, FORCE_FIELD)
+
         self.level_changed = False
+        # When to restart after the player died or the level changed
+        self.restart_time = None
+
+    @property
+    def enemies(self) -> list[Ship]:
+        """
+        Get every ship alive
+
+        :return: list[Ship], The ships
+        """
+        return [*self.droids, *self.commanders, *self.deaths]
+
+    def enemy_number(self, name: str) -> int:
+        """
+        Get the number of enemies of a type to spawn at the current level
+
+        :param name: str, The name of the enemy class
+        :return: int, The number of enemies
+        """
+        if self.horde:
+            base, growth = HORDE[name]
+            return min(round(base * growth ** (self.level - 1)), HORDE_MAX)
+        return ENEMY_NUMBER[name][min(self.level - 1, 4)]
+
+    def read_costs(self, frames: int) -> dict[str, float]:
+        """
+        Get the average cost of each part of a frame, and start measuring again
+
+        :param frames: int, The number of frames since the costs were last read
+        :return: dict[str, float], The time (ms) spent in each part per frame
+        """
+        costs = {name: cost * 1000 / max(frames, 1) for name, cost in self.costs.items()}
+        self.costs = dict.fromkeys(COSTS, 0.0)
+        return costs
 
     def handle_event(self, event: pygame.event.Event):
         """
@@ -106,21 +180,12 @@ class Engine(Screen):
 
         keys = pygame.key.get_pressed()
         if keys[self.config.keys["LEFT"]] and not keys[self.config.keys["RIGHT"]]:
-            self.player.rotating = "left"
+            rotating = "left"
         elif keys[self.config.keys["RIGHT"]] and not keys[self.config.keys["LEFT"]]:
-            self.player.rotating = "right"
+            rotating = "right"
         else:
-            self.player.rotating = ""
-
-        if keys[self.config.keys["UP"]] and self.player.can_thrust():
-            self.player.thrust()
-            self.player.set_image(Player.create_image(self.config.color, True))
-        else:
-            self.player.set_image(Player.create_image(self.config.color))
-
-        if keys[self.config.keys["SHOOT"]] and self.player.can_shoot():
-            self.player.shoot(self.player_lasers)
-            self.mixer.play("Laser", 0.1)
+            rotating = ""
+        self.act(rotating, keys[self.config.keys["UP"]], keys[self.config.keys["SHOOT"]])
 
     def handle_mouse(self):
         """
@@ -134,46 +199,67 @@ class Engine(Screen):
         vector = Vector(scaled_pos.x - self.player.x, scaled_pos.y - self.player.y)
         angle = self.player.rotation.angle_to(vector)
         if round(angle, 1) < 0:
-            self.player.rotating = "left"
+            rotating = "left"
         elif round(angle, 1) > 0:
-            self.player.rotating = "right"
+            rotating = "right"
         else:
-            self.player.rotating = ""
-
+            rotating = ""
         buttons = pygame.mouse.get_pressed()
-        if buttons[0] and self.player.can_thrust():
-            self.player.thrust()
-            self.player.set_image(Player.create_image(self.config.color, True))
-        else:
-            self.player.set_image(Player.create_image(self.config.color))
-
-        if buttons[2] and self.player.can_shoot():
-            self.player.shoot(self.player_lasers)
-            self.mixer.play("Laser", 0.1)
+        self.act(rotating, buttons[0], buttons[2])
 
         if not pygame.mouse.get_focused():
             self.pause()
 
+    def act(self, rotating: str, thrust: bool, shoot: bool):
+        """
+        Make the player act at the next tick, whatever the inputs come from
+        Only the last inputs given before a tick are used
+
+        :param rotating: str = "left" | "right" | "", Where the player rotates
+        :param thrust: bool, Whether the player tries to thrust or not
+        :param shoot: bool, Whether the player tries to shoot or not
+        """
+        self.inputs = (rotating, thrust, shoot)
+
+    def apply_inputs(self):
+        """
+        Make the player act with the inputs waiting for this tick
+        """
+        rotating, thrust, shoot = self.inputs
+        self.inputs = None
+        self.player.rotating = rotating
+
+        thrusting = thrust and self.player.can_thrust()
+        if thrusting:
+            self.player.thrust()
+        if thrusting != self.thrusting:
+            self.player.set_image(Player.create_image(self.config.color, thrusting))
+            self.thrusting = thrusting
+
+        if shoot and self.player.can_shoot():
+            self.render.add(self.player.shoot(self.player_lasers), LASERS)
+            self.mixer.play("Laser", 0.1)
+
     def pause(self):
         """
         Pause the game
         """
+        if self.recorder is not None:
+            self.recorder.pause()
         self.choice = PAUSE
-        for enemy in self.enemies:
-            if isinstance(enemy, CommandShip):
-                enemy.shoot_cooldown_pause = time() - enemy.last_shoot
-            if isinstance(enemy, (CommandShip, DeathShip)):
-                enemy.drop_cooldown_pause = time() - enemy.last_drop
+        for commander in self.commanders:
+            commander.shoot_cooldown_pause = clock.time() - commander.last_shoot
+        for ship in [*self.commanders, *self.deaths]:
+            ship.drop_cooldown_pause = clock.time() - ship.last_drop
 
     def unpause(self):
         """
         Unpause the game
         """
-        for enemy in self.enemies:
-            if isinstance(enemy, CommandShip):
-                enemy.last_shoot = time() - enemy.shoot_cooldown_pause
-            if isinstance(enemy, (CommandShip, DeathShip)):
-                enemy.last_drop = time() - enemy.drop_cooldown_pause
+        for commander in self.commanders:
+            commander.last_shoot = clock.time() - commander.shoot_cooldown_pause
+        for ship in [*self.commanders, *self.deaths]:
+            ship.last_drop = clock.time() - ship.drop_cooldown_pause
 
     def create_explosion(self, x: int, y: int):
         """
@@ -182,8 +268,48 @@ class Engine(Screen):
         :param x: int, The x coordinate of the explosion
         :param y: int, The y coordinate of the explosion
         """
-        self.explosions.append(Explosion(x, y))
-        self.mixer.play("Explosion", 0.5)
+        self.explosions.spawn(x, y)
+
+    def spawn(self, ship: Ship):
+        """
+        Add a ship to the game
+
+        :param ship: Ship, The ship to add
+        """
+        self.buckets[type(ship)][ship] = None
+        self.render.add(ship, ENEMIES)
+        self.ai.add(ship)
+
+    def remove(self, ship: Ship):
+        """
+        Remove a ship from the game
+
+        :param ship: Ship, The ship to remove
+        """
+        ship.die()
+        del self.buckets[type(ship)][ship]
+
+    def count_kill(self, entity: Entity):
+        """
+        Count a ship or a mine destroyed
+
+        :param entity: Entity, The ship or mine destroyed
+        """
+        name = type(entity).__name__
+        self.kills[name] = self.kills.get(name, 0) + 1
+
+    def transform(self, source: dict[Ship, None], kind: type):
+        """
+        Transform the oldest ship of a bucket into another kind of ship
+
+        :param source: dict[Ship, None], The bucket of the ship to transform
+        :param kind: type, The class of the new ship
+        """
+        if len(source) == 0:
+            return
+        ship = next(iter(source))
+        self.remove(ship)
+        self.spawn(kind(ship.x, ship.y, self.level))
 
     def ship_death(self, ship: Ship):
         """
@@ -192,20 +318,12 @@ class Engine(Screen):
 
         :param ship: Ship, The ship that died
         """
-        if isinstance(ship, CommandShip):
-            for i in range(len(self.enemies)):
-                enemy = self.enemies[i]
-                if enemy.alive and isinstance(enemy, DroidShip):
-                    transform = CommandShip(enemy.x, enemy.y, self.level)
-                    self.enemies[i] = transform
-                    break
-        elif isinstance(ship, DeathShip):
-            for i in range(len(self.enemies)):
-                enemy = self.enemies[i]
-                if enemy.alive and isinstance(enemy, CommandShip):
-                    transform = DeathShip(enemy.x, enemy.y, self.level)
-                    self.enemies[i] = transform
-                    break
+        self.remove(ship)
+        self.count_kill(ship)
+        if type(ship) is CommandShip:
+            self.transform(self.droids, CommandShip)
+        elif type(ship) is DeathShip:
+            self.transform(self.commanders, DeathShip)
 
     def player_death(self):
         """
@@ -214,7 +332,7 @@ class Engine(Screen):
         if not self.level_changed and self.player.alive:
             self.lives -= 1
             self.player.die()
-            Timer(1, self.restart).start()
+            self.restart_time = clock.time() + 1
 
     def change_level(self):
         """
@@ -223,28 +341,85 @@ class Engine(Screen):
         if not self.level_changed and self.player.alive:
             self.level += 1
             self.level_changed = True
-            Timer(1, self.restart).start()
+            self.restart_time = clock.time() + 1
 
-    def update_enemies(self, dt: int):
+    def update_player(self, dt: int):
         """
-        Update enemies situations
+        Update player situation
+
+        :param dt: int, The time delta between frames
+        """
+        self.player.update(dt)
 
+    def update_ships(self, ships: dict[Ship, None], dt: int):
+        """
+        Move ships of a bucket and crash them on the player
+
+        :param ships: dict[Ship, None], The ships to update
         :param dt: int, The time delta between frames
         """
-        for enemy in self.enemies:
-            enemy.update(dt)
-            if enemy.collide(self.player):
-                enemy.die()
+        crashed = []
+        for ship in ships:
+            ship.update(dt)
+            if ship.collide(self.player):
+                crashed.append(ship)
                 self.player_death()
                 self.create_explosion(self.player.x, self.player.y)
-                self.score += enemy.points
-            if isinstance(enemy, DroidShip) and enemy.can_see(self.player):
-                enemy.follow(self.player)
-            if isinstance(enemy, CommandShip) and enemy.can_shoot():
-                enemy.shoot(self.player, self.enemies_lasers)
+                self.score += ship.points
+        for ship in crashed:
+            self.remove(ship)
+            self.count_kill(ship)
+
+    def update_droids(self, dt: int):
+        """
+        Update droid ships situations
+
+        :param dt: int, The time delta between frames
+        """
+        self.update_ships(self.droids, dt)
+
+    def update_commanders(self, dt: int):
+        """
+        Update command ships situations
+
+        :param dt: int, The time delta between frames
+        """
+        self.update_ships(self.commanders, dt)
+        for commander in self.commanders:
+            if commander.can_shoot():
+                self.render.add(commander.shoot(self.player, self.enemies_lasers), LASERS)
                 self.mixer.play("Laser", 0.1)
-            if isinstance(enemy, (CommandShip, DeathShip)) and enemy.can_drop():
-                enemy.drop_mine(self.mines)
+            if commander.can_drop():
+                self.render.add(commander.drop_mine(self.mines), MINES)
+
+    def update_deaths(self, dt: int):
+        """
+        Update death ships situations
+
+        :param dt: int, The time delta between frames
+        """
+        self.update_ships(self.deaths, dt)
+        for death in self.deaths:
+            if death.can_drop():
+                self.render.add(death.drop_mine(self.mines), MINES)
+
+    def update_enemies(self, dt: int):
+        """
+        Update enemies situations
+
+        :param dt: int, The time delta between frames
+        """
+        self.update_droids(dt)
+        self.update_commanders(dt)
+        self.update_deaths(dt)
+
+    def update_ai(self, dt: int):
+        """
+        Let some of the ships decide where to go
+
+        :param dt: int, The time delta between frames
+        """
+        self.ai.update(self.player)
 
     def update_mines(self, dt: int):
         """
@@ -255,6 +430,7 @@ class Engine(Screen):
         for mine in self.mines:
             if mine.collide(self.player):
                 mine.die()
+                self.count_kill(mine)
                 self.player_death()
                 self.create_explosion(self.player.x, self.player.y)
                 self.score += mine.points
@@ -267,65 +443,99 @@ class Engine(Screen):
         """
         for laser in self.player_lasers:
             laser.update(dt)
-            for enemy in self.enemies + self.mines:
-                if laser.collide(enemy):
-                    laser.die()
-                    enemy.die()
-                    if isinstance(enemy, Ship):
-                        self.ship_death(enemy)
-                    self.create_explosion(enemy.x, enemy.y)
-                    self.score += enemy.points
-                    break
+            self.shoot_down(laser)
 
         for laser in self.enemies_lasers:
             laser.update(dt)
-            if laser.collide(self.player):
+            if laser.sweep(self.player) is not None:
                 laser.die()
                 self.player_death()
                 self.create_explosion(self.player.x, self.player.y)
 
+    def shoot_down(self, laser: Laser):
+        """
+        Destroy the first ship or mine hit by a laser of the player
+
+        :param laser: Laser, The laser
+        """
+        if not laser.alive:
+            return
+        for ships in self.buckets.values():
+            for ship in ships:
+                if laser.sweep(ship) is not None:
+                    laser.die()
+                    self.ship_death(ship)
+                    self.create_explosion(ship.x, ship.y)
+                    self.score += ship.points
+                    return
+        for mine in self.mines:
+            if laser.sweep(mine) is not None:
+                laser.die()
+                mine.die()
+                self.count_kill(mine)
+                self.create_explosion(mine.x, mine.y)
+                self.score += mine.points
+                return
+
     def update_explosions(self, dt: int):
         """
         Update explosions situations
 
         :param dt: int, The time delta between frames
         """
-        for explosion in self.explosions:
-            explosion.update()
+        if self.explosions.spawned > 0:
+            # A single sound for all the explosions of a step, chain reactions would pile them up
+            self.mixer.play("Explosion", 0.5)
+        self.explosions.update(dt)
 
-    def update(self, dt: int):
+    def update_force_field(self, dt: int):
         """
-        Update the game instance
+        Update the force field and bounce entities on it
 
         :param dt: int, The time delta between frames
         """
-
-        self.player.update(dt)
-        self.update_enemies(dt)
-        self.update_mines(dt)
-        self.update_lasers(dt)
-        self.update_explosions(dt)
-
         self.force_field.update()
         self.force_field.bounce(
             self.player,
-            *self.enemies,
+            *self.droids,
+            *self.commanders,
+            *self.deaths,
             *self.player_lasers,
             *self.enemies_lasers,
         )
 
-        self.objects = [
-            *self.player_lasers,
-            *self.enemies_lasers,
-            *self.mines,
-            *self.enemies,
-            self.player,
-            *self.explosions,
-            self.force_field,
-        ]
+    def draw(self, surface: pygame.Surface):
+        """
+        Draw the game on the given surface, entities are interpolated between simulation steps
+
+        :param surface: pygame.Surface, The surface to draw the game on
+        """
+        start = perf_counter()
+        self.render.draw(surface, self.alpha)
+        self.costs["draw"] += perf_counter() - start
+
+    def update(self, dt: int):
+        """
+        Update the game instance
+
+        :param dt: int, The time delta between frames
+        """
+        if self.recorder is not None:
+            self.recorder.tick(dt, self.inputs)
+        if self.inputs is not None:
+            self.apply_inputs()
+        clock.advance(dt)
+        if self.restart_time is not None and clock.time() >= self.restart_time:
+            self.restart()
+        # Entities moved since the last step
+        sight.clear()
+        for name, phase in self.phases:
+            start = perf_counter()
+            phase(dt)
+            self.costs[name] += perf_counter() - start
 
         # Level cleared
-        if all(not enemy.alive for enemy in self.enemies):
+        if not any(self.buckets.values()):
             self.change_level()
 
         # Gameover
@@ -0,0 +1,303 @@
+import sys
+import random
+import pygame
+from array import array
+from heapq import nsmallest
+from time import perf_counter
+from src.clock import clock
+from src.farm import headless
+from src.objects.base import Entity
+from src.objects.sprites import DroidShip, CommandShip, DeathShip, VaporMine
+from src.const import (
+    WIN_WIDTH,
+    WIN_HEIGHT,
+    BLACK,
+    TICK,
+    GAMEOVER,
+    ENV_ENEMIES,
+    ENV_LASERS,
+    ENV_MINES,
+    ENV_LIFE_COST,
+    ENV_LIMIT,
+)
+
+try:
+    import numpy
+except Exception:
+    numpy = None
+
+# Actions are numbers, each one a way to rotate, thrust and shoot
+ACTIONS = [
+    (rotating, thrust, shoot)
+    for rotating in ("", "left", "right")
+    for thrust in (False, True)
+    for shoot in (False, True)
+]
+KINDS = [DroidShip, CommandShip, DeathShip]
+
+
+def nearest(entities: list[Entity], x: float, y: float, count: int) -> list[Entity]:
+    """
+    Get the entities alive closest to a point
+
+    :param entities: list[Entity], The entities
+    :param x: float, The x coordinate of the point
+    :param y: float, The y coordinate of the point
+    :param count: int, The number of entities to get at most
+    :return: list[Entity], The closest entities, from the closest
+    """
+    alive = [entity for entity in entities if entity.alive]
+    return nsmallest(count, alive, key=lambda entity: (entity.x - x) ** 2 + (entity.y - y) ** 2)
+
+
+class Env:
+    """
+    The Env lets programs play the game one step at a time, with the API of reinforcement learning environments (gym's)
+    Observations are built from the state of the engine without drawing anything, unless frames are asked for
+    Each environment has its own clock and random generator, so many of them can be played side by side
+
+    The observation of the state is made of floats,
+    positions relative to the player and divided by the size of the window:
+    the player (x, y, velocity, rotation, alive), then for the closest enemies (present, position, velocity, type),
+    enemy lasers (present, position, velocity) and mines (present, position, vapor), absent ones are zeros
+
+    :param horde: bool = False, Whether to play against hordes of enemies or not
+    :param ticks: int = 1, The number of ticks a step lasts, with the same action
+    :param pixels: tuple[int, int] = None, The size of the frames to observe instead of the state
+    :param limit: float = ENV_LIMIT, The longest time (s) a game lasts before being cut
+    """
+
+    size = 7 + ENV_ENEMIES * 8 + ENV_LASERS * 5 + ENV_MINES * 4
+
+    def __init__(self, horde: bool = False, ticks: int = 1, pixels: tuple[int, int] = None, limit: float = ENV_LIMIT):
+        self.engine = headless(horde)
+        self.ticks = ticks
+        self.pixels = pixels
+        self.limit = limit
+        if pixels is not None:
+            self.frame = pygame.Surface((WIN_WIDTH, WIN_HEIGHT)).convert_alpha()
+        # The time and random state of the game, while another one is in use
+        self.time = None
+        self.state = random.getstate()
+        self.elapsed = 0
+        self.score = 0
+        self.lives = 0
+
+    def swap(self):
+        """
+        Exchange the time and random state of the game with the ones in use, before and after moving it
+        """
+        self.time, clock.simulated = clock.simulated, self.time
+        state = random.getstate()
+        random.setstate(self.state)
+        self.state = state
+
+    def reset(self, seed: int = None) -> tuple:
+        """
+        Start a new game
+
+        :param seed: int = None, The seed of the game, the same seed always gives the same game for the same actions
+        :return: tuple[numpy.ndarray | array, dict], The first observation and an empty info
+        """
+        self.swap()
+        random.seed(seed)
+        clock.simulate()
+        self.engine.start()
+        self.swap()
+        self.elapsed = 0
+        self.score = self.engine.score
+        self.lives = self.engine.lives
+        return self.observe(), {}
+
+    def step(self, action: int) -> tuple:
+        """
+        Play an action for a step
+
+        :param action: int, The index of the action in ACTIONS
+        :return: tuple[numpy.ndarray | array, float, bool, bool, dict], The observation, the reward
+        (points won, minus ENV_LIFE_COST for each life lost), whether the game is over, whether it was cut and an info
+        """
+        engine = self.engine
+        rotating, thrust, shoot = ACTIONS[action]
+        self.swap()
+        for i in range(self.ticks):
+            engine.act(rotating, thrust, shoot)
+            engine.update(TICK)
+            self.elapsed += TICK
+            if engine.choice == GAMEOVER:
+                break
+        self.swap()
+
+        reward = engine.score - self.score - (self.lives - engine.lives) * ENV_LIFE_COST
+        self.score = engine.score
+        self.lives = engine.lives
+        terminated = engine.choice == GAMEOVER
+        truncated = not terminated and self.elapsed >= self.limit * 1000
+        info = {"score": engine.score, "level": engine.level, "lives": engine.lives}
+        return self.observe(), reward, terminated, truncated, info
+
+    def observe(self):
+        """
+        Get the observation of the game
+
+        :return: numpy.ndarray | array | bytes, The state as floats, or the RGB frame when pixels were asked for
+        (without NumPy, the state is an array of floats and the frame is bytes)
+        """
+        if self.pixels is not None:
+            return self.draw()
+
+        engine = self.engine
+        player = engine.player
+        x, y = player.x, player.y
+        rotation = player.rotation
+        values = [
+            x / WIN_WIDTH,
+            y / WIN_HEIGHT,
+            player.direction.x * player.speed,
+            player.direction.y * player.speed,
+            rotation.x,
+            rotation.y,
+            float(player.alive),
+        ]
+        ships = nearest(engine.enemies, x, y, ENV_ENEMIES)
+        for ship in ships:
+            values += [1, (ship.x - x) / WIN_WIDTH, (ship.y - y) / WIN_HEIGHT]
+            values += [ship.direction.x * ship.speed, ship.direction.y * ship.speed]
+            values += [float(isinstance(ship, kind)) for kind in KINDS]
+        values += [0] * (ENV_ENEMIES - len(ships)) * 8
+        lasers = nearest(engine.enemies_lasers, x, y, ENV_LASERS)
+        for laser in lasers:
+            values += [1, (laser.x - x) / WIN_WIDTH, (laser.y - y) / WIN_HEIGHT]
+            values += [laser.direction.x * laser.speed, laser.direction.y * laser.speed]
+        values += [0] * (ENV_LASERS - len(lasers)) * 5
+        mines = nearest(engine.mines, x, y, ENV_MINES)
+        for mine in mines:
+            values += [1, (mine.x - x) / WIN_WIDTH, (mine.y - y) / WIN_HEIGHT, float(isinstance(mine, VaporMine))]
+        values += [0] * (ENV_MINES - len(mines)) * 4
+
+        observation = array("f", values)
+        return numpy.frombuffer(observation, numpy.float32) if numpy is not None else observation
+
+    def draw(self):
+        """
+        Draw the game and get its frame
+
+        :return: numpy.ndarray | bytes, The frame (height, width, RGB), bytes without NumPy
+        """
+        self.frame.fill(BLACK)
+        self.engine.draw(self.frame)
+        frame = self.frame
+        if self.pixels != (WIN_WIDTH, WIN_HEIGHT):
+            frame = pygame.transform.scale(frame, self.pixels)
+        data = pygame.image.tobytes(frame, "RGB")
+        if numpy is None:
+            return data
+        return numpy.frombuffer(data, numpy.uint8).reshape(self.pixels[1], self.pixels[0], 3)
+
+
+class VecEnv:
+    """
+    The VecEnv plays several independent games at once, in the same process
+    Games are started again as soon as they end, the last observation of a game is then in the info as "final"
+
+    :param count: int, The number of games
+    :param options: The options of each Env
+    """
+
+    def __init__(self, count: int, **options):
+        self.envs = [Env(**options) for i in range(count)]
+        self.seed = None
+
+    def stack(self, values: list):
+        """
+        Put the values of every game together
+
+        :param values: list, The values, one per game
+        :return: numpy.ndarray | list, The values, a list without NumPy
+        """
+        return numpy.stack(values) if numpy is not None else values
+
+    def next_seed(self) -> int:
+        """
+        Get the seed of the next game to start
+
+        :return: int, The seed (None when the first games weren't seeded)
+        """
+        if self.seed is None:
+            return None
+        self.seed += 1
+        return self.seed - 1
+
+    def reset(self, seed: int = None) -> tuple:
+        """
+        Start new games, the next ones get the next seeds
+
+        :param seed: int = None, The seed of the first game
+        :return: tuple[numpy.ndarray | list, list[dict]], The first observations and empty infos
+        """
+        self.seed = seed
+        results = [env.reset(self.next_seed()) for env in self.envs]
+        return self.stack([observation for observation, info in results]), [info for observation, info in results]
+
+    def step(self, actions: list[int]) -> tuple:
+        """
+        Play an action in each game for a step
+
+        :param actions: list[int], The index of the action in ACTIONS for each game
+        :return: tuple, The observations, rewards, whether games are over, whether they were cut and infos
+        """
+        observations, rewards, terminations, truncations, infos = [], [], [], [], []
+        for env, action in zip(self.envs, actions):
+            observation, reward, terminated, truncated, info = env.step(action)
+            if terminated or truncated:
+                info["final"] = observation
+                observation, _ = env.reset(self.next_seed())
+            observations.append(observation)
+            rewards.append(reward)
+            terminations.append(terminated)
+            truncations.append(truncated)
+            infos.append(info)
+        return self.stack(observations), self.stack(rewards), self.stack(terminations), self.stack(truncations), infos
+
+
+def check_reset(seed: int = 0, steps: int = 3000) -> bool:
+    """
+    Check that a game played in an environment already used plays like the same game in a new one
+
+    :param seed: int = 0, The seed of the game
+    :param steps: int = 3000, The number of steps to compare
+    :return: bool, Whether both games went the same way or not
+    """
+    actions = random.Random(seed)
+    plan = [actions.randrange(len(ACTIONS)) for i in range(steps)]
+    used = Env()
+    used.reset(seed + 1)
+    for action in plan[:500]:
+        used.step(action)
+
+    traces = []
+    for env in (Env(), used):
+        observation, info = env.reset(seed)
+        trace = [bytes(observation)]
+        for action in plan:
+            observation, reward, terminated, truncated, info = env.step(action)
+            trace.append((bytes(observation), reward, terminated))
+            if terminated:
+                break
+        traces.append(trace)
+    return traces[0] == traces[1]
+
+
+if __name__ == "__main__":
+    # python -m src.env [games] [steps]
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    steps = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    print(f"Games reset in a used environment play {'like' if check_reset() else 'NOT like'} in a new one")
+    envs = VecEnv(count)
+    envs.reset(0)
+    actions = random.Random(0)
+    start = perf_counter()
+    for i in range(steps):
+        envs.step([actions.randrange(len(ACTIONS)) for env in envs.envs])
+    elapsed = perf_counter() - start
+    print(f"{count * steps} steps of {count} games in {elapsed:.2f} s ({count * steps / elapsed:.0f} steps/s)")
@@ -0,0 +1,154 @@
+import os
+import sys
+import random
+import pygame
+from time import perf_counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from src.clock import clock
+from src.engine import Engine
+from src.config import Config
+from src.mixer import Mixer
+from src.vector import Vector
+from src.const import WIN_WIDTH, WIN_HEIGHT, TICK, GAMEOVER
+
+
+def random_policy(engine: Engine, rng: random.Random) -> tuple[str, bool, bool]:
+    """
+    Play by pressing random keys
+
+    :param engine: Engine, The engine to play
+    :param rng: random.Random, The random generator of the policy
+    :return: tuple[str, bool, bool], Where to rotate, whether to thrust and whether to shoot
+    """
+    return rng.choice(("left", "right", "")), rng.random() < 0.05, rng.random() < 0.5
+
+
+def aim_policy(engine: Engine, rng: random.Random) -> tuple[str, bool, bool]:
+    """
+    Play by turning towards the closest ship and shooting when facing it
+
+    :param engine: Engine, The engine to play
+    :param rng: random.Random, The random generator of the policy
+    :return: tuple[str, bool, bool], Where to rotate, whether to thrust and whether to shoot
+    """
+    player = engine.player
+    enemies = engine.enemies
+    if len(enemies) == 0:
+        return "", False, False
+    target = min(enemies, key=lambda ship: (ship.x - player.x) ** 2 + (ship.y - player.y) ** 2)
+    angle = player.rotation.angle_to(Vector(target.x - player.x, target.y - player.y))
+    rotating = "left" if angle < -0.05 else "right" if angle > 0.05 else ""
+    return rotating, rng.random() < 0.02, abs(angle) < 0.2
+
+
+POLICIES = {"random": random_policy, "aim": aim_policy}
+
+
+def setup():
+    """
+    Prepare a worker process to run games without a window or sound
+    """
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    pygame.init()
+    pygame.mixer.init()
+    # Images are converted to the format of the display
+    pygame.display.set_mode((WIN_WIDTH, WIN_HEIGHT))
+
+
+def headless(horde: bool = False) -> Engine:
+    """
+    Make an engine to play without a window or sound, setting the process up first if needed
+    Its AI has no time budget, so games don't depend on the speed of the computer
+
+    :param horde: bool = False, Whether to play against hordes of enemies or not
+    :return: Engine, The engine, not started yet
+    """
+    if pygame.display.get_surface() is None:
+        setup()
+    config = Config()
+    config.volume = 0
+    engine = Engine(config, Mixer(config), horde)
+    engine.ai.budget = float("inf")
+    return engine
+
+
+def play(seed: int, policy: str = "random", horde: bool = False, limit: float = 300) -> dict:
+    """
+    Play a whole game headless, the same seed always gives the same game
+
+    :param seed: int, The seed of the random generators
+    :param policy: str = "random" | "aim", How the player plays
+    :param horde: bool = False, Whether to play against hordes of enemies or not
+    :param limit: float = 300, The longest time (s) to play for
+    :return: dict, The summary of the game
+    """
+    random.seed(seed)
+    rng = random.Random(seed)
+    clock.simulate()
+    engine = headless(horde)
+    engine.start()
+
+    ticks, alive = 0, 0
+    while engine.choice != GAMEOVER and ticks * TICK < limit * 1000:
+        engine.act(*POLICIES[policy](engine, rng))
+        engine.update(TICK)
+        ticks += 1
+        alive += engine.player.alive
+    return {
+        "seed": seed,
+        "policy": policy,
+        "score": engine.score,
+        "level": engine.level,
+        "time": ticks * TICK / 1000,
+        "alive": alive * TICK / 1000,
+        "over": engine.choice == GAMEOVER,
+        "kills": dict(engine.kills),
+    }
+
+
+def farm(games: int, workers: int = None, policy: str = "random", horde: bool = False, seed: int = 0) -> list[dict]:
+    """
+    Play many games in worker processes and print a summary of the results
+    Summaries are printed as games finish
+
+    :param games: int, The number of games to play
+    :param workers: int = None, The number of processes to use (depends on the CPU by default)
+    :param policy: str = "random" | "aim", How the player plays
+    :param horde: bool = False, Whether to play against hordes of enemies or not
+    :param seed: int = 0, The seed of the first game, the next ones follow
+    :return: list[dict], The summaries of the games, by seed
+    """
+    start = perf_counter()
+    summaries = []
+    with ProcessPoolExecutor(workers, initializer=setup) as pool:
+        futures = [pool.submit(play, seed + i, policy, horde) for i in range(games)]
+        for future in as_completed(futures):
+            summary = future.result()
+            summaries.append(summary)
+            print(
+                f"[{len(summaries)}/{games}] seed {summary['seed']}: score {summary['score']}, "
+                f"level {summary['level']}, alive {summary['alive']:.1f} s"
+            )
+    elapsed = perf_counter() - start
+    summaries.sort(key=lambda summary: summary["seed"])
+
+    scores = [summary["score"] for summary in summaries]
+    kinds = sorted({kind for summary in summaries for kind in summary["kills"]})
+    print(f"{games} games with the {policy} policy in {elapsed:.1f} s ({games / elapsed:.2f} games/s)")
+    print(f"    score: mean {sum(scores) / games:.0f}, min {min(scores)}, max {max(scores)}")
+    print(f"    level: mean {sum(summary['level'] for summary in summaries) / games:.2f}")
+    print(f"    time alive: mean {sum(summary['alive'] for summary in summaries) / games:.1f} s")
+    print(f"    games over: {sum(summary['over'] for summary in summaries)}")
+    for kind in kinds:
+        print(f"    {kind} killed: mean {sum(summary['kills'].get(kind, 0) for summary in summaries) / games:.2f}")
+    return summaries
+
+
+if __name__ == "__main__":
+    # python -m src.farm [games] [workers] [random | aim]
+    farm(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 100,
+        int(sys.argv[2]) if len(sys.argv) > 2 else None,
+        sys.argv[3] if len(sys.argv) > 3 else "random",
+    )
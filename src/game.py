@@ -1,12 +1,18 @@
 import sys
 import pygame
 import asyncio
+from time import perf_counter
 from src.objects.graphics import Background, Panel
 from src.screens import Welcome, Home, Scores, Settings, Pause, GameOver
 from src.engine import Engine
 from src.config import Config
 from src.mixer import Mixer
 from src.data import Data
+from src.assets import assets
+from src.presenter import Presenter
+from src.renderer import Renderer
+from src.governor import governor
+from src.recording import Recorder
 from src.const import (
     WIN_WIDTH,
     WIN_HEIGHT,
@@ -18,99 +24,243 @@ from src.const import (
     PAUSE,
     GAMEOVER,
     EXIT,
+    TICK,
+    MAX_FRAME,
+    IDLE_DELAY,
+    IDLE_FPS,
+    UNFOCUSED_FPS,
 )
 
 
 class Game:
     """
     The main game instance, handles display and inputs
+
+    :param profile: bool = False, Whether to print startup timings or not
+    :param pipelined: bool = False, Whether to scale frames from another thread or not (experimental)
+    :param renderer: str = "surface" | "gpu" | "software", How to display frames,
+    "gpu" and "software" use SDL's renderer
+    :param horde: bool = False, Whether to play against hordes of enemies or not
+    :param record: bool = False, Whether to record the games or not, to play them again with src.recording
+    :param costs: bool = False, Whether to print the cost of each part of the frames every second while playing or not
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        profile: bool = False,
+        pipelined: bool = False,
+        renderer: str = "surface",
+        horde: bool = False,
+        record: bool = False,
+        costs: bool = False,
+    ):
+        self.profile = profile
+        self.costs = costs
+        self.start_time = perf_counter()
+        # Frames since the costs were last printed
+        self.frames = 0
+        self.last_report = perf_counter()
+
         pygame.init()
         pygame.mixer.init()
 
         pygame.display.set_icon(pygame.image.load("assets/images/Icon.png"))
         pygame.display.set_caption("Omega Race")
 
-        self.display = pygame.display.set_mode((WIN_WIDTH, WIN_HEIGHT), pygame.RESIZABLE)
+        if renderer != "surface" and sys.platform != "emscripten":
+            # Images still need a display to be converted, it stays hidden behind the renderer's window
+            self.display = pygame.display.set_mode((WIN_WIDTH, WIN_HEIGHT), pygame.HIDDEN)
+            self.renderer = Renderer(software=renderer == "software")
+        else:
+            self.display = pygame.display.set_mode((WIN_WIDTH, WIN_HEIGHT), pygame.RESIZABLE)
+            self.renderer = None
         self.clock = pygame.time.Clock()
+        assets.start()
 
         self.config = Config()
         self.data = Data()
         self.mixer = Mixer(self.config)
 
-        self.background = Background()
+        # Frames are double buffered when they are displayed from another thread
+        self.presenter = Presenter() if pipelined and self.renderer is None and sys.platform != "emscripten" else None
+        self.background = Background(2 if self.presenter is not None else 1)
         self.panel = Panel(self.config)
 
+        self.recorder = Recorder() if record else None
         self.current = None
-        self.screens = {
-            WELCOME: Welcome(self.config, self.mixer),
-            HOME: Home(self.config, self.mixer),
-            PLAY: Engine(self.config, self.mixer),
-            SCORES: Scores(self.config, self.mixer, self.data),
-            SETTINGS: Settings(self.config, self.mixer),
-            PAUSE: Pause(self.config, self.mixer),
-            GAMEOVER: GameOver(self.config, self.mixer),
+        # Time not yet simulated by the engine
+        self.accumulator = 0
+        # Used to slow down when nobody is looking or playing
+        self.last_input = perf_counter()
+        self.focused = True
+        self.visible = True
+        # Screens are only constructed when they are first used
+        self.screens = {}
+        self.factories = {
+            WELCOME: lambda: Welcome(self.config, self.mixer),
+            HOME: lambda: Home(self.config, self.mixer),
+            PLAY: lambda: Engine(self.config, self.mixer, horde, self.recorder),
+            SCORES: lambda: Scores(self.config, self.mixer, self.data),
+            SETTINGS: lambda: Settings(self.config, self.mixer),
+            PAUSE: lambda: Pause(self.config, self.mixer),
+            GAMEOVER: lambda: GameOver(self.config, self.mixer),
         }
 
+    def screen(self, id: int):
+        """
+        Get a screen, constructing it if needed
+
+        :param id: int, The id of the screen
+        :return: Screen, The screen
+        """
+        if id not in self.screens:
+            self.screens[id] = self.factories[id]()
+        return self.screens[id]
+
     def handle_inputs(self):
         """
         Handle user events and keypresses depending on the current screen
         """
-        events = pygame.event.get()
-        for event in events:
-            if event.type == pygame.QUIT:
+        for event in pygame.event.get():
+            if (
+                self.renderer is not None
+                and pygame.event.event_name(event.type).startswith("Window")
+                and getattr(event, "window", None) is not self.renderer.window
+            ):
+                # Window events of the hidden display, which only have window=None
+                continue
+            if event.type == pygame.QUIT or (self.renderer is not None and event.type == pygame.WINDOWCLOSE):
                 self.exit()
+            elif self.renderer is not None and event.type == pygame.WINDOWSIZECHANGED:
+                # The mouse position is scaled with the size of the display
+                self.display = pygame.display.set_mode((event.x, event.y), pygame.HIDDEN)
+            elif event.type in (pygame.WINDOWFOCUSLOST, pygame.WINDOWFOCUSGAINED):
+                self.focused = event.type == pygame.WINDOWFOCUSGAINED
+                if not self.focused and self.current == PLAY:
+                    self.screen(PLAY).pause()
+            elif event.type in (pygame.WINDOWMINIMIZED, pygame.WINDOWHIDDEN):
+                self.visible = False
+            elif event.type in (pygame.WINDOWRESTORED, pygame.WINDOWSHOWN, pygame.WINDOWEXPOSED):
+                self.visible = True
             else:
-                self.screens[self.current].handle_event(event)
+                self.last_input = perf_counter()
+                self.screen(self.current).handle_event(event)
 
-        self.screens[self.current].handle_keys()
-        self.screens[self.current].handle_mouse()
+        self.screen(self.current).handle_keys()
+        self.screen(self.current).handle_mouse()
 
-        choice = self.screens[self.current].choice
+        choice = self.screen(self.current).choice
         if choice is not None:
             if choice == PLAY:
                 self.mixer.music("Battle", 0.1)
                 if self.current != PAUSE:
-                    self.screens[PLAY].start()
+                    self.screen(PLAY).start()
                 else:
-                    self.screens[PLAY].unpause()
+                    self.screen(PLAY).unpause()
             if self.current == PLAY:
                 self.mixer.music("Menu", 0.3)
             if choice == GAMEOVER:
-                score, level = self.screens[PLAY].score, self.screens[PLAY].level
+                score, level = self.screen(PLAY).score, self.screen(PLAY).level
                 self.data.add_score(self.config.name, score, level)
+                if self.recorder is not None:
+                    self.recorder.end(score, level)
             if choice == EXIT:
                 self.exit()
             self.current = choice
-            self.screens[self.current].reset()
+            self.screen(self.current).reset()
+
+    def get_fps(self) -> int:
+        """
+        Get the frame rate to run at, lower when the game is idle or in the background
+
+        :return: int, The frame rate (0 for no limit)
+        """
+        if not self.visible and sys.platform != "emscripten":
+            # The loop is blocked waiting for events instead
+            return 0
+        if not self.focused:
+            return min(UNFOCUSED_FPS, self.config.fps)
+        if self.current != PLAY and perf_counter() - self.last_input > IDLE_DELAY:
+            return min(IDLE_FPS, self.config.fps)
+        return self.config.fps
+
+    def wait(self):
+        """
+        Block until something happens while the window is hidden
+        """
+        if self.visible or sys.platform == "emscripten":
+            return
+        event = pygame.event.wait(1000)
+        if event.type != pygame.NOEVENT:
+            pygame.event.post(event)
 
     def update(self):
         """
         Update the situation of all objects depending on the current screen
         """
-        dt = self.clock.tick(self.config.fps)
+        fps = self.get_fps()
+        dt = self.clock.tick(fps)
+        governor.update(self.clock.get_rawtime(), fps)
+
+        if self.current == WELCOME and not assets.loaded:
+            # The welcome screen is mostly waiting for the user, use that time
+            assets.preload(1000 / self.config.fps / 2)
+            if self.profile and assets.loaded:
+                print(f"Assets preloaded after {(perf_counter() - self.start_time) * 1000:.1f} ms")
+                for (kind, key), timing in sorted(assets.timings.items(), key=lambda item: -item[1]):
+                    print(f"    {kind} {key}: {timing:.1f} ms")
 
         self.data.update()
         self.mixer.update()
         self.background.update(dt)
-        self.screens[self.current].update(dt)
+        if self.current == PLAY:
+            # The engine always moves forward by the same step, whatever the frame rate is
+            engine = self.screen(PLAY)
+            self.accumulator = min(self.accumulator + dt, MAX_FRAME)
+            while self.accumulator >= TICK:
+                engine.update(TICK)
+                self.accumulator -= TICK
+            engine.alpha = self.accumulator / TICK
+        else:
+            self.screen(self.current).update(dt)
 
         if self.current == PLAY:
-            engine = self.screens[PLAY]
+            engine = self.screen(PLAY)
             lives, level, score = engine.lives, engine.level, engine.score
             self.panel.update(lives, level, score, max(score, self.data.highscore))
 
+            if self.costs:
+                self.frames += 1
+                if perf_counter() - self.last_report >= 1:
+                    costs = engine.read_costs(self.frames)
+                    breakdown = ", ".join(f"{name} {cost:.2f}" for name, cost in costs.items())
+                    print(f"Frame costs (ms) with {len(engine.enemies)} enemies: {breakdown}")
+                    self.frames = 0
+                    self.last_report = perf_counter()
+
     def draw(self):
         """
         Draw the game objects on top of the background and display it
         """
-        self.screens[self.current].draw(self.background.image)
+        if self.renderer is None or self.current != PLAY:
+            # The renderer draws the engine itself
+            self.screen(self.current).draw(self.background.image)
         if self.current in [PLAY, PAUSE, GAMEOVER]:
             self.panel.draw(self.background.image)
-        size = self.display.get_size()
-        pygame.transform.smoothscale(self.background.image, size, self.display)
+        if self.renderer is not None:
+            if self.current == PLAY:
+                engine = self.screen(PLAY)
+                self.renderer.present(self.background.image, engine.render, engine.alpha)
+            else:
+                self.renderer.present(self.background.image)
+        elif self.presenter is not None:
+            self.presenter.present(self.background.image, self.display)
+            self.background.swap()
+        else:
+            size = self.display.get_size()
+            scale = pygame.transform.smoothscale if governor.smooth else pygame.transform.scale
+            scale(self.background.image, size, self.display)
+            pygame.display.update()
 
     async def run(self):
         """
@@ -118,11 +268,17 @@ class Game:
         """
         self.current = WELCOME
         self.mixer.music("Menu", 0.3)
+        if self.profile:
+            print(f"Game initialized after {(perf_counter() - self.start_time) * 1000:.1f} ms")
+        first_frame = True
         while True:
+            self.wait()
             self.handle_inputs()
             self.update()
             self.draw()
-            pygame.display.update()
+            if self.profile and first_frame:
+                print(f"First frame displayed after {(perf_counter() - self.start_time) * 1000:.1f} ms")
+            first_frame = False
             await asyncio.sleep(0)
 
     def exit(self):
@@ -130,5 +286,9 @@ class Game:
         Close the window and exit the program
         """
         self.config.save()
+        if self.recorder is not None and PLAY in self.screens:
+            self.recorder.end(self.screen(PLAY).score, self.screen(PLAY).level)
+        if self.presenter is not None:
+            self.presenter.stop()
         pygame.quit()
         sys.exit(0)
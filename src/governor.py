@@ -0,0 +1,84 @@
+from time import time
+from src.const import QUALITY_LEVELS, QUALITY_DOWN, QUALITY_UP, QUALITY_COOLDOWN, QUALITY_RECOVERY
+
+
+class Governor:
+    """
+    The Governor watches the time spent on each frame and lowers the quality when it doesn't fit the frame rate,
+    then raises it back when there is room again
+    Raising waits longer than lowering, so the quality doesn't keep going back and forth
+    """
+
+    def __init__(self):
+        self.level = 0
+        self.average = 0
+        self.last_change = time()
+
+    @property
+    def stars(self) -> int:
+        """
+        Get the number of stars to show in the background
+
+        :return: int, The number of stars
+        """
+        return QUALITY_LEVELS[self.level][1]["stars"]
+
+    @property
+    def smooth(self) -> bool:
+        """
+        Check if frames should be smoothly scaled to the window
+
+        :return: bool, Whether to use smoothscale or not
+        """
+        return QUALITY_LEVELS[self.level][1]["smooth"]
+
+    @property
+    def explosion_step(self) -> int:
+        """
+        Get the number of explosion images to go through at once
+
+        :return: int, The step between explosion images
+        """
+        return QUALITY_LEVELS[self.level][1]["explosion_step"]
+
+    @property
+    def rotations(self) -> int:
+        """
+        Get the number of rotations of sprites to choose from
+
+        :return: int, The number of rotations (0 to rotate by the exact angle)
+        """
+        return QUALITY_LEVELS[self.level][1]["rotations"]
+
+    def change(self, step: int):
+        """
+        Change the quality level
+
+        :param step: int, 1 to lower the quality, -1 to raise it
+        """
+        self.level += step
+        self.last_change = time()
+        print(f"Quality level {self.level} ({QUALITY_LEVELS[self.level][0]}), {self.average:.1f} ms per frame")
+
+    def update(self, work: float, fps: int):
+        """
+        Update the quality level
+
+        :param work: float, The time (ms) spent on the last frame, without waiting
+        :param fps: int, The frame rate we try to reach (0 for no limit)
+        """
+        if fps <= 0:
+            return
+        budget = 1000 / fps
+        self.average = self.average * 0.95 + work * 0.05
+
+        since = time() - self.last_change
+        if since < QUALITY_COOLDOWN:
+            return
+        if self.average > budget * QUALITY_DOWN and self.level < len(QUALITY_LEVELS) - 1:
+            self.change(1)
+        elif self.average < budget * QUALITY_UP and self.level > 0 and since > QUALITY_RECOVERY:
+            self.change(-1)
+
+
+governor = Governor()
@@ -0,0 +1,46 @@
+import sys
+from time import perf_counter
+from src.farm import headless
+from src.objects.graphics import Background
+from src.const import TICK, AI_BUDGET
+
+
+def stress(levels: int = 3, frames: int = 300) -> list[dict[str, float]]:
+    """
+    Play horde levels without a window and measure the cost of each part of a frame
+    The player keeps turning and shooting, one simulation step is run per frame
+
+    :param levels: int = 3, The number of levels to play
+    :param frames: int = 300, The number of frames to play for each level
+    :return: list[dict[str, float]], The time (ms) spent in each part per frame, for each level
+    """
+    engine = headless(horde=True)
+    # Frames are measured as they are played, with the time budget of the AI
+    engine.ai.budget = AI_BUDGET
+    background = Background()
+    engine.start()
+
+    reports = []
+    for level in range(1, levels + 1):
+        engine.level = level
+        engine.restart()
+        engine.read_costs(1)
+        enemies = len(engine.enemies)
+        start = perf_counter()
+        for frame in range(frames):
+            engine.act("left", False, True)
+            engine.update(TICK)
+            background.update(TICK)
+            engine.draw(background.image)
+        total = (perf_counter() - start) * 1000 / frames
+        costs = engine.read_costs(frames)
+        print(f"Level {level}, {enemies} enemies: {total:.2f} ms per frame")
+        for name, cost in costs.items():
+            print(f"    {name}: {cost:.2f} ms")
+        reports.append(costs)
+    return reports
+
+
+if __name__ == "__main__":
+    # python -m src.horde [levels] [frames]
+    stress(*(int(arg) for arg in sys.argv[1:3]))
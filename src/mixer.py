@@ -1,5 +1,6 @@
 import pygame
 from src.config import Config
+from src.assets import assets
 
 
 class Mixer:
@@ -38,6 +39,6 @@ class Mixer:
         :param file: str, The filename of the sound
         :param volume: float, The volume to play the sound at
         """
-        sound = pygame.mixer.Sound(f"assets/sounds/{file}.ogg")
+        sound = assets.sound(file)
         sound.set_volume(volume * self.config.volume)
         sound.play()
@@ -1,9 +1,10 @@
 from __future__ import annotations
 import pygame
-from time import time
-from math import pi, degrees
+from math import ceil, hypot
 from src.vector import Vector
-from src.const import WHITE
+from src.assets import assets
+from src.governor import governor
+from src.const import WHITE, ANGLES
 
 
 class Object:
@@ -16,6 +17,8 @@ class Object:
     """
 
     def __init__(self, x: int, y: int, image):
+        # The layer of the render list the object is drawn in
+        self.layer: dict[Object, None] = None
         self.set_position(x, y)
         self.set_image(image)
 
@@ -36,14 +39,29 @@ class Object:
         :param image: str | pygame.Surface, The image of the object
         """
         if isinstance(image, str):
-            self.image = pygame.image.load(f"assets/images/{image}").convert_alpha()
+            self.image = assets.image(image)
+            self._mask = assets.mask(image)
+            self.radius = assets.radius(image)
         elif isinstance(image, pygame.Surface):
             self.image = image.convert_alpha()
+            # The mask will only be computed if a collision check needs it
+            self._mask = None
+            self.radius = hypot(*self.image.get_size()) / 2
         else:
             raise TypeError(f"'{type(image).__name__} can't be used as an image")
-        self.mask = pygame.mask.from_surface(self.image)
         self.rect = self.image.get_rect(center=(self.x, self.y))
 
+    @property
+    def mask(self) -> pygame.mask.Mask:
+        """
+        Get the mask of the object, computed from its image the first time it is needed
+
+        :return: pygame.mask.Mask, The mask of the object
+        """
+        if self._mask is None:
+            self._mask = pygame.mask.from_surface(self.image)
+        return self._mask
+
     def draw(self, surface: pygame.Surface):
         """
         Draw the object on the surface
@@ -52,6 +70,14 @@ class Object:
         """
         surface.blit(self.image, self.rect)
 
+    def unregister(self):
+        """
+        Remove the object from the render list it is drawn in
+        """
+        if self.layer is not None:
+            del self.layer[self]
+            self.layer = None
+
     def collide(self, other: Object) -> bool:
         """
         Check for collision with any other object
@@ -61,9 +87,27 @@ class Object:
         return (
             (not isinstance(self, Entity) or self.alive)
             and (not isinstance(other, Entity) or other.alive)
-            and pygame.sprite.collide_mask(self, other)
+            and self.overlap(other)
         )
 
+    def overlap(self, other: Object) -> bool:
+        """
+        Check if the object overlaps any other object
+        Cheap tests on the bounding rects and circles reject most pairs before comparing masks
+
+        :param other: Object, The object to check for overlap with
+        :return: bool, Whether the objects overlap or not
+        """
+        # Positions are the centers of the images, up to a pixel once they are placed
+        dx, dy = other.x - self.x, other.y - self.y
+        reach = self.radius + other.radius + 3
+        if dx * dx + dy * dy > reach * reach:
+            return False
+        if not self.rect.colliderect(other.rect):
+            return False
+        # Masks are only compared where the rects intersect
+        return self.mask.overlap(other.mask, (other.rect.x - self.rect.x, other.rect.y - self.rect.y)) is not None
+
 
 class Entity(Object):
     """
@@ -87,11 +131,23 @@ class Entity(Object):
         speed: float,
     ):
         super().__init__(x, y, image)
+        self.previous = (x, y)
         self.set_direction(direction)
         self.set_rotation(rotation)
         self.set_speed(speed)
         self.alive = True
 
+    def set_position(self, x: int, y: int):
+        """
+        Set the position of the entity
+
+        :param x: int > 0, The x coordinate of the entity
+        :param y: int > 0, The y coordinate of the entity
+        """
+        self.x = x
+        self.y = y
+        self._rect = None
+
     def set_image(self, image):
         """
         Set the image of the entity,
@@ -99,12 +155,46 @@ class Entity(Object):
         :param image: str | pygame.Surface, The image of the entity
         """
         if isinstance(image, str):
-            self.image = pygame.image.load(f"assets/images/{image}").convert_alpha()
+            self.base_image = assets.image(image)
+            self._mask = assets.mask(image)
+            self.radius = assets.radius(image)
         elif isinstance(image, pygame.Surface):
-            self.image = image.convert_alpha()
-        self.base_image = self.image
-        self.mask = pygame.mask.from_surface(self.image)
-        self.rect = self.image.get_rect(center=(self.x, self.y))
+            self.base_image = image.convert_alpha()
+            self._mask = None
+            self.radius = hypot(*self.base_image.get_size()) / 2
+        self._image = self.base_image
+        # Named images can be taken from the rotation atlas
+        self.name = image if isinstance(image, str) else None
+        # The angle the image is rotated by, and its place in the rotation atlas (None for the exact angle)
+        self.angle = 0
+        self.atlas = None
+        self._rect = None
+
+    @property
+    def image(self) -> pygame.Surface:
+        """
+        Get the rotated image of the entity, created the first time it is needed after the rotation changed
+        The renderer rotates the base image itself, so it is then only created for collisions
+
+        :return: pygame.Surface, The rotated image
+        """
+        if self._image is None:
+            if self.atlas is not None:
+                self._image = assets.rotation(self.name, *self.atlas)
+            else:
+                self._image = pygame.transform.rotate(self.base_image, self.angle)
+        return self._image
+
+    @property
+    def rect(self) -> pygame.Rect:
+        """
+        Get the rect of the rotated image, centered on the entity
+
+        :return: pygame.Rect, The rect of the entity
+        """
+        if self._rect is None:
+            self._rect = self.image.get_rect(center=(self.x, self.y))
+        return self._rect
 
     def set_direction(self, direction: Vector):
         """
@@ -117,16 +207,31 @@ class Entity(Object):
         else:
             self.direction = direction.copy()
 
+    @property
+    def rotation(self) -> Vector:
+        """
+        Get the rotation of the entity, as a unit vector
+
+        :return: Vector, The rotation the entity has
+        """
+        return Vector.from_heading(self.heading)
+
     def set_rotation(self, rotation: Vector):
         """
         Set the rotation of the entity
 
         :param rotation: Vector, The rotation the entity has
         """
-        if round(rotation.norm, 5) != 0:
-            self.rotation = rotation.normalized()
-        else:
-            self.rotation = rotation.copy()
+        # The heading is kept rather than the vector, so rotating needs no trigonometry
+        self.heading = rotation.heading
+
+    def rotate_by(self, heading: float):
+        """
+        Rotate the entity clockwise
+
+        :param heading: float, The heading to rotate by (ANGLES for a full turn)
+        """
+        self.heading = (self.heading + heading) % ANGLES
 
     def set_speed(self, speed: float):
         """
@@ -136,21 +241,68 @@ class Entity(Object):
         """
         self.speed = speed
 
+    def bounced(self):
+        """
+        React to a bounce on a border, nothing happens by default
+        """
+
     def die(self):
         """
         Make the entity die, when dead an entity doesn't move and isn't displayed
         """
         self.alive = False
+        self.unregister()
 
-    def draw(self, surface: pygame.Surface):
+    def interpolate(self, alpha: float) -> pygame.Rect:
+        """
+        Get the rect of the entity between its previous position and the current one
+
+        :param alpha: float, How far we are from the previous position (0) to the current one (1)
+        :return: pygame.Rect, The interpolated rect
+        """
+        return self.rect.move((self.x - self.previous[0]) * (alpha - 1), (self.y - self.previous[1]) * (alpha - 1))
+
+    def draw(self, surface: pygame.Surface, alpha: float = 1):
         """
         Draw the rotated entity on the surface
 
         :param surface: pygame.Surface, The surface to draw the object on
+        :param alpha: float = 1, How far we are from the previous position (0) to the current one (1)
         """
         if not self.alive:
             return
-        super().draw(surface)
+        surface.blit(self.image, self.rect if alpha == 1 else self.interpolate(alpha))
+
+    def sweep(self, other: Object) -> tuple[float, float]:
+        """
+        Check for collision with any other object along the path followed during the last update
+        This way fast entities can't go through thin or small objects between two updates
+
+        :param other: Object (Entity), The object to check for collision with
+        :return: tuple[float, float], The first position touching the object, None if there is none
+        """
+        if not self.alive or (isinstance(other, Entity) and not other.alive):
+            return None
+        # The path must come close enough to the object first, this doesn't need the rotated image
+        reach = self.radius + other.radius + 4
+        near = pygame.Rect(other.x - reach, other.y - reach, 2 * reach, 2 * reach)
+        if not near.clipline(self.previous, (self.x, self.y)):
+            return None
+        if self.overlap(other):
+            return (self.x, self.y)
+        # Only walk the part of the path close enough to the object
+        area = other.rect.inflate(self.rect.width, self.rect.height)
+        path = area.clipline(self.previous, (self.x, self.y))
+        if len(path) == 0:
+            return None
+        (x1, y1), (x2, y2) = path
+        steps = max(ceil(hypot(x2 - x1, y2 - y1)), 1)
+        for i in range(steps + 1):
+            x, y = x1 + (x2 - x1) * i / steps, y1 + (y2 - y1) * i / steps
+            left, top = round(x - self.rect.width / 2), round(y - self.rect.height / 2)
+            if self.mask.overlap(other.mask, (other.rect.x - left, other.rect.y - top)):
+                return (x, y)
+        return None
 
     def move(self, dt: int):
         """
@@ -171,12 +323,21 @@ class Entity(Object):
         """
         if not self.alive:
             return
+        self.previous = (self.x, self.y)
         self.move(dt)
-        # Create the rotated image and center it properly
-        angle = -degrees(self.rotation.angle + pi / 2)
-        self.image = pygame.transform.rotate(self.base_image, angle)
-        self.mask = pygame.mask.from_surface(self.image)
-        self.rect = self.image.get_rect(center=(self.x, self.y))
+        self._rect = None
+        # The rotated image will be created when needed, only if the rotation changed
+        steps = governor.rotations
+        if steps > 0 and self.name is not None:
+            index = round(self.heading * steps / ANGLES) % steps
+            angle = -index * 360 / steps
+        else:
+            angle = -self.heading * 360 / ANGLES
+        if angle != self.angle:
+            self.angle = angle
+            self.atlas = (index, steps) if steps > 0 and self.name is not None else None
+            self._image = None
+            self._mask = None
 
 
 class Text(Object):
@@ -200,21 +361,27 @@ class Text(Object):
         color: tuple = WHITE,
         anchor: str = "center",
     ):
-        self.font = pygame.font.Font("assets/fonts/font.ttf", size)
+        self.font = assets.font("font.ttf", size)
         self.image = self.font.render(content, True, color).convert_alpha()
         super().__init__(x, y, self.image)
+        self.content, self.color, self.anchor = None, None, None
         self.update(content, color, anchor)
 
-    def update(self, content: str = None, color: tuple = None, anchor: str = None):
+    def update(self, content: str = None, color: tuple = None, anchor: str = None) -> bool:
         """
         Update the text image
 
         :param content: str, The content of the text
         :param color: tuple, The color (RGBA) of the text
-        """
-        self.content = content if content is not None else self.content
-        self.color = color if color is not None else self.color
-        self.anchor = anchor if anchor is not None else self.anchor
+        :return: bool, Whether the text changed or not
+        """
+        content = content if content is not None else self.content
+        color = color if color is not None else self.color
+        anchor = anchor if anchor is not None else self.anchor
+        # Rendering is costly, don't do it for nothing
+        if (content, color, anchor) == (self.content, self.color, self.anchor):
+            return False
+        self.content, self.color, self.anchor = content, color, anchor
         self.image = self.font.render(self.content, True, self.color).convert_alpha()
         if self.anchor == "center":
             self.rect = self.image.get_rect(center=(self.x, self.y))
@@ -222,45 +389,4 @@ class Text(Object):
             self.rect = self.image.get_rect(midleft=(self.x, self.y))
         elif self.anchor == "right":
             self.rect = self.image.get_rect(midright=(self.x, self.y))
-
-
-class Explosion(Object):
-    """
-    Represent an animated explosion
-
-    :param x: int, The x coordinate of the explosion
-    :param y: int, The x coordinate of the explosion
-    """
-
-    def __init__(self, x: int, y: int):
-        self.step = 1
-        self.last_update = time()
-        super().__init__(x, y, "Explosion1.png")
-
-    def can_update(self) -> bool:
-        """
-        Check if the explosion can be updated
-
-        :return: bool, Whether it's been long enough or not
-        """
-        return self.step < 6 and time() - self.last_update > 0.1
-
-    def update(self):
-        """
-        Update the state of the explosion
-        """
-        if not self.can_update():
-            return
-        self.step += 1
-        self.last_update = time()
-        self.set_image(f"Explosion{self.step}.png")
-
-    def draw(self, surface: pygame.Surface):
-        """
-        Draw the explosion on the surface
-
-        :param surface: pygame.Surface, The surface to draw the explosion on
-        """
-        if self.step >= 6 and time() - self.last_update > 0.1:
-            return
-        super().draw(surface)
+        return True
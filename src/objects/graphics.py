@@ -1,10 +1,12 @@
 import pygame
-from time import time
-from random import randrange, random
-from src.thread import Timer
+from array import array
+from random import Random
+from src.clock import clock
 from src.objects.base import Object, Entity, Text
-from src.objects.sprites import Player, Laser
+from src.objects.sprites import Player
 from src.vector import Vector
+from src.assets import assets
+from src.governor import governor
 from src.config import Config
 from src.const import (
     WIN_WIDTH,
@@ -19,6 +21,8 @@ from src.const import (
     YELLOW,
     ORANGE,
     RED,
+    FRAME_DURATION,
+    EFFECTS_CAPACITY,
 )
 
 
@@ -26,19 +30,31 @@ class Background:
     """
     The Background of the game, every other object will be displayed over it
     There are stars moving, so beautiful
+
+    :param buffers: int = 1, The number of images to draw frames on in turn
     """
 
-    def __init__(self):
-        self.image = pygame.Surface((WIN_WIDTH, WIN_HEIGHT)).convert_alpha()
+    def __init__(self, buffers: int = 1):
+        self.images = [pygame.Surface((WIN_WIDTH, WIN_HEIGHT)).convert_alpha() for i in range(buffers)]
+        self.image = self.images[0]
+        # Stars have their own random generator, so recorded games only depend on their seed
+        self.random = Random()
         self.stars = [
             [
-                randrange(WIN_WIDTH),
-                randrange(WIN_HEIGHT),
-                random() / 20,
+                self.random.randrange(WIN_WIDTH),
+                self.random.randrange(WIN_HEIGHT),
+                self.random.random() / 20,
             ]
             for i in range(128)
         ]
 
+    def swap(self):
+        """
+        Draw the next frames on the next image
+        """
+        self.images.append(self.images.pop(0))
+        self.image = self.images[0]
+
     def update(self, dt: int):
         """
         Move stars on the background
@@ -49,11 +65,11 @@ class Background:
         # alpha.fill((0, 0, 0, min(int(dt * 3), 255)))
         # self.image.blit(alpha, (0, 0))
         self.image.fill(BLACK)
-        for star in self.stars:
+        for star in self.stars[: governor.stars]:
             pygame.draw.rect(self.image, WHITE, (star[0], star[1], 1, 1))
             star[1] -= star[2] * dt
             if star[1] < 0:
-                star[0] = randrange(WIN_WIDTH)
+                star[0] = self.random.randrange(WIN_WIDTH)
                 star[1] = WIN_HEIGHT
 
 
@@ -71,8 +87,11 @@ class Panel:
         self.score = Text("0", 330, 375, anchor="left")
         self.highscore_text = Text("HIGHSCORE", 330, 415, anchor="left")
         self.highscore = Text("0", 330, 450, anchor="left")
-        self.image = Player.create_image(self.config.color)
-        self.lives = 3
+        self.state = None
+
+        area = pygame.Rect(CEN_X - PAN_WIDTH / 2, CEN_Y - PAN_HEIGHT / 2, PAN_WIDTH, PAN_HEIGHT)
+        self.composite = Composite([], area)
+        self.update(3, 1, 0, 0)
 
     def draw(self, surface: pygame.Surface):
         """
@@ -80,13 +99,7 @@ class Panel:
 
         :param surface: pygame.Surface, The surface to draw the panel on
         """
-        self.level.draw(surface)
-        self.score_text.draw(surface)
-        self.score.draw(surface)
-        self.highscore_text.draw(surface)
-        self.highscore.draw(surface)
-        for i in range(self.lives):
-            surface.blit(self.image, (630, 330 + 50 * i))
+        self.composite.draw(surface)
 
     def update(self, lives: int, level: int, score: int, highscore: int):
         """
@@ -97,14 +110,231 @@ class Panel:
         :param score: int, The score of the player
         :param highscore: int, The game highest score
         """
-        self.lives = lives
+        state = (lives, level, score, highscore, self.config.color)
+        if state == self.state:
+            return
+        self.state = state
+
         self.level.update(
             f"LEVEL {level}",
             [WHITE, GREEN, YELLOW, ORANGE, RED][min(level - 1, 4)],
         )
         self.score.update(content=str(score))
         self.highscore.update(content=str(highscore))
-        self.image = Player.create_image(self.config.color)
+        image = Player.create_image(self.config.color)
+        lives = [Object(0, 0, image) for i in range(lives)]
+        # Placed by their corner, as centers would be rounded
+        for i, life in enumerate(lives):
+            life.rect.topleft = (630, 330 + 50 * i)
+
+        self.composite.objects = [self.level, self.score_text, self.score, self.highscore_text, self.highscore, *lives]
+        self.composite.invalidate()
+
+
+class RenderList:
+    """
+    The RenderList keeps the objects to draw, layer by layer
+    Objects are added when they appear and removed when they disappear,
+    so each layer can be drawn in a single call
+
+    :param layers: int, The number of layers
+    :param moving: tuple[int], The layers holding entities, drawn between their last two positions
+    """
+
+    def __init__(self, layers: int, moving: tuple[int] = ()):
+        # Dicts are used as ordered sets
+        self.layers: list[dict[Object, None]] = [{} for i in range(layers)]
+        self.moving = moving
+        # Batches of effects, drawn on top of the objects of their layer
+        self.batches: list[list[Effects]] = [[] for i in range(layers)]
+
+    def add(self, obj: Object, layer: int):
+        """
+        Add an object to a layer, it will be drawn on top of those already there
+
+        :param obj: Object, The object to add
+        :param layer: int, The layer to add the object to
+        """
+        obj.unregister()
+        self.layers[layer][obj] = None
+        obj.layer = self.layers[layer]
+
+    def add_batch(self, batch: "Effects", layer: int):
+        """
+        Add a batch of effects to a layer, it stays there when the objects are cleared
+
+        :param batch: Effects, The batch to add
+        :param layer: int, The layer to add the batch to
+        """
+        if batch not in self.batches[layer]:
+            self.batches[layer].append(batch)
+
+    def clear(self):
+        """
+        Remove every object
+        """
+        for layer in self.layers:
+            for obj in layer:
+                obj.layer = None
+            layer.clear()
+
+    def draw(self, surface: pygame.Surface, alpha: float = 1):
+        """
+        Draw all layers on the surface
+
+        :param surface: pygame.Surface, The surface to draw on
+        :param alpha: float = 1, How far entities are from their previous position (0) to the current one (1)
+        """
+        for i, layer in enumerate(self.layers):
+            if alpha != 1 and i in self.moving:
+                surface.blits([(obj.image, obj.interpolate(alpha)) for obj in layer], False)
+            else:
+                surface.blits([(obj.image, obj.rect) for obj in layer], False)
+            for batch in self.batches[i]:
+                surface.blits(batch.sequence(), False)
+
+
+class Effects:
+    """
+    Effects are short animations with no behavior, like explosions
+    They are kept in a pool of arrays, updated and drawn all at once instead of being objects,
+    so a lot of them can appear at the same time without slowing down the game
+
+    :param images: list[str], The filenames of the images of the animation
+    :param capacity: int = EFFECTS_CAPACITY, The number of effects the pool starts with, it grows if needed
+    """
+
+    def __init__(self, images: list[str], capacity: int = EFFECTS_CAPACITY):
+        self.frames = [assets.image(name) for name in images]
+        # Offsets from the center of the effect to the corner of each image
+        self.offsets = [(-frame.get_width() / 2, -frame.get_height() / 2) for frame in self.frames]
+        self.x = array("d", [0]) * capacity
+        self.y = array("d", [0]) * capacity
+        self.age = array("d", [0]) * capacity
+        # Active effects are packed at the start of the arrays
+        self.count = 0
+        # Effects started since the last update
+        self.spawned = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def spawn(self, x: float, y: float):
+        """
+        Start an effect
+
+        :param x: float, The x coordinate of the center of the effect
+        :param y: float, The y coordinate of the center of the effect
+        """
+        if self.count == len(self.x):
+            for values in (self.x, self.y, self.age):
+                values.extend(array("d", [0]) * len(values))
+        self.x[self.count] = x
+        self.y[self.count] = y
+        self.age[self.count] = 0
+        self.count += 1
+        self.spawned += 1
+
+    def clear(self):
+        """
+        Stop every effect
+        """
+        self.count = 0
+        self.spawned = 0
+
+    def frame(self, age: float) -> int:
+        """
+        Get the image an effect shows at a given age, -1 once it is over
+        Images are skipped when the quality is lowered
+
+        :param age: float, The time (ms) since the effect started
+        :return: int, The index of the image
+        """
+        step = governor.explosion_step
+        index = int(age // FRAME_DURATION) * step
+        last = len(self.frames) - 1
+        return -1 if index >= last + step else min(index, last)
+
+    def update(self, dt: int):
+        """
+        Move every effect forward, the finished ones are replaced by the last active ones
+
+        :param dt: int, The time delta between frames
+        """
+        self.spawned = 0
+        x, y, age = self.x, self.y, self.age
+        i = 0
+        while i < self.count:
+            age[i] += dt
+            if self.frame(age[i]) == -1:
+                self.count -= 1
+                last = self.count
+                x[i], y[i], age[i] = x[last], y[last], age[last]
+            else:
+                i += 1
+
+    def sequence(self) -> list[tuple[pygame.Surface, tuple[float, float]]]:
+        """
+        Get the images of every effect with their positions, as expected by Surface.blits
+
+        :return: list[tuple[pygame.Surface, tuple[float, float]]], The images and positions
+        """
+        frames, offsets = self.frames, self.offsets
+        sequence = []
+        for i in range(self.count):
+            frame = self.frame(self.age[i])
+            dx, dy = offsets[frame]
+            sequence.append((frames[frame], (self.x[i] + dx, self.y[i] + dy)))
+        return sequence
+
+
+class Composite(Object):
+    """
+    A Composite draws a group of objects that rarely change from a single cached image
+    It must be invalidated when one of the objects changes
+
+    :param objects: list[Object], The objects to draw
+    :param area: pygame.Rect = None, The area covering the objects (the whole window by default)
+    """
+
+    def __init__(self, objects: list[Object], area: pygame.Rect = None):
+        self.objects = objects
+        self.area = pygame.Rect(area) if area is not None else pygame.Rect(0, 0, WIN_WIDTH, WIN_HEIGHT)
+        super().__init__(self.area.centerx, self.area.centery, pygame.Surface(self.area.size, pygame.SRCALPHA))
+        self.dirty = True
+
+    def invalidate(self):
+        """
+        Ask for the image to be composed again
+        """
+        self.dirty = True
+
+    def update(self):
+        """
+        Compose the image again if needed
+        """
+        if not self.dirty:
+            return
+        # A new image is made rather than cleared, so anything cached from the old one isn't reused
+        self.image = pygame.Surface(self.area.size, pygame.SRCALPHA).convert_alpha()
+        # Objects don't overlap, taking the maximum just copies them with their alpha
+        offset = (-self.area.x, -self.area.y)
+        self.image.blits(
+            [(obj.image, obj.rect.move(offset), None, pygame.BLEND_RGBA_MAX) for obj in self.objects],
+            False,
+        )
+        # The image is mostly transparent, run-length encoding makes it very cheap to draw
+        self.image.set_alpha(255, pygame.RLEACCEL)
+        self.dirty = False
+
+    def draw(self, surface: pygame.Surface):
+        """
+        Draw the composed image on the surface
+
+        :param surface: pygame.Surface, The surface to draw the composite on
+        """
+        self.update()
+        super().draw(surface)
 
 
 class Border(Object):
@@ -125,6 +355,8 @@ class Border(Object):
         self.normal = normal
         self.visible = visible
         self.changed = True
+        # When to hide the border after it blinked, on the game clock as it changes the mask
+        self.hide_time = None
         self.update()
 
     def show(self):
@@ -140,6 +372,7 @@ class Border(Object):
         """
         self.visible = False
         self.changed = True
+        self.hide_time = None
 
     def blink(self):
         """
@@ -148,7 +381,7 @@ class Border(Object):
         if self.visible:
             return
         self.show()
-        Timer(0.15, self.hide).start()
+        self.hide_time = clock.time() + 0.15
 
     def update(self):
         """
@@ -173,15 +406,13 @@ class Border(Object):
         :param entity: Entity, The entity to bounce
         """
         # We use dot product to know if the object should bounce on the collided border
-        if entity.collide(self) and self.normal.dot(entity.direction) < 0:
+        contact = entity.sweep(self)
+        if contact is not None and self.normal.dot(entity.direction) < 0:
+            # Bring back entities that went through the border
+            entity.set_position(*contact)
             entity.set_direction(entity.direction.reflect(self.normal))
-            # Slow player
-            if isinstance(entity, Player):
-                entity.set_speed(entity.speed * 0.75)
-                entity.last_collision = time()
-            # Crash lasers
-            elif isinstance(entity, Laser):
-                entity.die()
+            # The player slows down and lasers crash
+            entity.bounced()
             self.blink()
 
 
@@ -212,6 +443,7 @@ class ForceField:
             Border(CEN_X, CEN_Y - PAN_HEIGHT / 2, PAN_WIDTH + 3, 3, top, True),
             Border(CEN_X, CEN_Y + PAN_HEIGHT / 2, PAN_WIDTH + 3, 3, bottom, True),
         ]
+        self.composite = Composite(self.borders)
 
     def draw(self, surface: pygame.Surface):
         """
@@ -219,15 +451,19 @@ class ForceField:
 
         :param surface: pygame.Surface, The surface to draw the force field on
         """
-        for border in self.borders:
-            border.draw(surface)
+        self.composite.draw(surface)
 
     def update(self):
         """
         Update the state of the force field
         """
         for border in self.borders:
-            border.update()
+            if border.hide_time is not None and clock.time() >= border.hide_time:
+                border.hide()
+            if border.changed:
+                border.update()
+                self.composite.invalidate()
+        self.composite.update()
 
     def bounce(self, *entities: tuple[Entity]):
         """
@@ -235,6 +471,14 @@ class ForceField:
 
         :param entities: tuple[Entity], The entities to bounce
         """
+        rects = [border.rect for border in self.borders]
         for entity in entities:
-            for border in self.borders:
-                border.bounce(entity)
+            if not entity.alive:
+                continue
+            # Only borders near the path followed during the last update can be touched
+            x, y = entity.previous
+            reach = entity.radius + 4
+            left, top = min(x, entity.x) - reach, min(y, entity.y) - reach
+            path = pygame.Rect(left, top, abs(entity.x - x) + 2 * reach, abs(entity.y - y) + 2 * reach)
+            for index in path.collidelistall(rects):
+                self.borders[index].bounce(entity)
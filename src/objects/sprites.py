@@ -1,10 +1,13 @@
 import pygame
-from time import time
-from math import pi, sqrt
+from math import sqrt
 from random import randrange, random, choice
 from src.objects.base import Entity
 from src.vector import Vector
-from src.const import CEN_X, CEN_Y, PAN_WIDTH, PAN_HEIGHT, WHITE
+from src.assets import assets
+from src.clock import clock
+from src.patrol import patrol
+from src.sight import sight
+from src.const import WHITE, PATROL_CELL, ANGLES
 
 
 class Laser(Entity):
@@ -21,6 +24,12 @@ class Laser(Entity):
         image.fill(WHITE)
         super().__init__(x, y, image, direction, direction, 0.3)
 
+    def bounced(self):
+        """
+        Crash the laser on a border
+        """
+        self.die()
+
 
 class Player(Entity):
     """
@@ -42,8 +51,8 @@ class Player(Entity):
         Create the player image with the given color
         """
         n_details = 2 if thrusting else 1
-        details = pygame.image.load(f"assets/images/PlayerDetails{n_details}.png")
-        shell = pygame.image.load("assets/images/PlayerShell.png")
+        details = assets.image(f"PlayerDetails{n_details}.png")
+        shell = assets.image("PlayerShell.png").copy()
         color_mask = pygame.Surface(shell.get_size())
         color_mask.fill(color)
         shell.blit(color_mask, (0, 0), special_flags=pygame.BLEND_RGB_MULT)
@@ -56,7 +65,7 @@ class Player(Entity):
 
         :return: bool, Whether you can thrust or not
         """
-        return self.alive and time() - self.last_collision >= 0.3
+        return self.alive and clock.time() - self.last_collision >= 0.3
 
     def can_shoot(self) -> bool:
         """
@@ -64,7 +73,7 @@ class Player(Entity):
 
         :return: bool, Whether you can shoot or not
         """
-        return self.alive and time() - self.last_shoot >= 0.4
+        return self.alive and clock.time() - self.last_shoot >= 0.4
 
     def thrust(self):
         """
@@ -72,16 +81,25 @@ class Player(Entity):
         """
         self.set_direction(self.rotation)
         self.speed = 0.2
-        self.last_thrust = time()
+        self.last_thrust = clock.time()
 
-    def shoot(self, lasers: list[Laser]):
+    def bounced(self):
+        """
+        Slow the player down after bouncing on a border
+        """
+        self.set_speed(self.speed * 0.75)
+        self.last_collision = clock.time()
+
+    def shoot(self, lasers: list[Laser]) -> Laser:
         """
         Shoot a laser
 
         :param lasers: list[Laser], The lasers already in game
+        :return: Laser, The laser shot
         """
         lasers.append(Laser(self.x, self.y, self.rotation))
-        self.last_shoot = time()
+        self.last_shoot = clock.time()
+        return lasers[-1]
 
     def rotate(self, dt: int):
         """
@@ -90,9 +108,9 @@ class Player(Entity):
         :param dt: int, The time delta between frames
         """
         if self.rotating == "left":
-            self.set_rotation(self.rotation.rotate(-dt * pi / 725))
+            self.rotate_by(-dt * ANGLES / 1450)
         elif self.rotating == "right":
-            self.set_rotation(self.rotation.rotate(dt * pi / 725))
+            self.rotate_by(dt * ANGLES / 1450)
 
     def update(self, dt: int):
         """
@@ -167,7 +185,8 @@ class Ship(Entity):
         level: int,
     ):
         super().__init__(x, y, image, direction, direction, speed * sqrt(level))
-        self.distance = randrange(50, 250)
+        # Multiples of the cells of the patrol grid, so turning happens at the same place
+        self.distance = randrange(50, 250, PATROL_CELL)
         self.points = points
 
     def can_see(self, entity: Entity) -> bool:
@@ -176,37 +195,15 @@ class Ship(Entity):
 
         :return: bool, Whether the ship can see the player or not
         """
-
-        panel_x, panel_y = CEN_X - PAN_WIDTH / 2, CEN_Y - PAN_HEIGHT / 2
-        panel_rect = pygame.Rect(panel_x - 10, panel_y - 10, PAN_WIDTH + 20, PAN_HEIGHT + 20)
-        intersections = panel_rect.clipline(self.x, self.y, entity.x, entity.y)
-        return self.alive and len(intersections) == 0
+        return sight.visible(self, entity)
 
     def turn(self):
         """
         Change ship direction when reaching the right distance
         """
-        # TODO: Look for improvements here
-        # top left
-        if (self.x + self.distance < CEN_X - PAN_WIDTH / 2 and self.y < CEN_Y - PAN_HEIGHT / 2) or (
-            self.x < CEN_X - PAN_WIDTH / 2 and CEN_Y - PAN_HEIGHT / 2 < self.y < CEN_Y + PAN_HEIGHT / 2 + self.distance
-        ):
-            self.set_direction(Vector(0, 1))
-        # top right
-        if (self.x > CEN_X + PAN_WIDTH / 2 and self.y + self.distance < CEN_Y - PAN_HEIGHT / 2) or (
-            CEN_X - PAN_WIDTH / 2 - self.distance < self.x < CEN_X + PAN_WIDTH / 2 and self.y < CEN_Y - PAN_HEIGHT / 2
-        ):
-            self.set_direction(Vector(-1, 0))
-        # bottom right
-        if (self.x - self.distance > CEN_X + PAN_WIDTH / 2 and self.y > CEN_Y + PAN_HEIGHT / 2) or (
-            self.x > CEN_X + PAN_WIDTH / 2 and CEN_Y - PAN_HEIGHT / 2 - self.distance < self.y < CEN_Y + PAN_HEIGHT / 2
-        ):
-            self.set_direction(Vector(0, -1))
-        # bottom left
-        if (self.x < CEN_X - PAN_WIDTH / 2 and self.y - self.distance > CEN_Y + PAN_HEIGHT / 2) or (
-            CEN_X - PAN_WIDTH / 2 < self.x < CEN_X + PAN_WIDTH / 2 + self.distance and self.y > CEN_Y + PAN_HEIGHT / 2
-        ):
-            self.set_direction(Vector(1, 0))
+        direction = patrol.direction(self.x, self.y, self.distance)
+        if direction is not None:
+            self.set_direction(direction)
 
     def rotate(self, dt: int):
         """
@@ -214,7 +211,15 @@ class Ship(Entity):
 
         :param dt: int, The time delta between frames
         """
-        self.set_rotation(self.rotation.rotate(pi * dt / 4096))
+        self.rotate_by(dt * ANGLES / 8192)
+
+    def think(self, player: Player):
+        """
+        Decide where to go, this doesn't happen every frame
+
+        :param player: Player, The player
+        """
+        self.turn()
 
     def update(self, dt: int):
         """
@@ -224,7 +229,6 @@ class Ship(Entity):
         """
         super().update(dt)
         self.rotate(dt)
-        self.turn()
 
 
 class DroidShip(Ship):
@@ -249,6 +253,16 @@ class DroidShip(Ship):
         direction = Vector(player.x - self.x, player.y - self.y)
         self.set_direction(direction)
 
+    def think(self, player: Player):
+        """
+        Decide where to go, following the player when it can be seen
+
+        :param player: Player, The player
+        """
+        super().think(player)
+        if self.can_see(player):
+            self.follow(player)
+
 
 class CommandShip(Ship):
     """
@@ -263,10 +277,10 @@ class CommandShip(Ship):
         direction = Vector(1, 0)
         super().__init__(x, y, "CommandShip.png", direction, 0.05, 1500, level)
         self.drop_cooldown = randrange(10, 20)
-        self.last_drop = time()
+        self.last_drop = clock.time()
         self.shoot_cooldown = randrange(3, 8)
-        self.last_shoot = time()
-        self.init = time()
+        self.last_shoot = clock.time()
+        self.init = clock.time()
 
     def can_drop(self) -> bool:
         """
@@ -274,7 +288,7 @@ class CommandShip(Ship):
 
         :return: bool, Whether the ship can drop a mine or not
         """
-        return self.alive and time() - self.last_drop >= self.drop_cooldown
+        return self.alive and clock.time() - self.last_drop >= self.drop_cooldown
 
     def can_shoot(self) -> bool:
         """
@@ -282,36 +296,40 @@ class CommandShip(Ship):
 
         :return: bool, Whether the ship can shoot or not
         """
-        return self.alive and time() - self.last_shoot >= self.shoot_cooldown
+        return self.alive and clock.time() - self.last_shoot >= self.shoot_cooldown
 
-    def drop_mine(self, mines: list[Mine]):
+    def drop_mine(self, mines: list[Mine]) -> Mine:
         """
         Drop a Photon Mine at the ship's position
 
         :param mines: list[Mine], The mines already in the game
+        :return: Mine, The mine dropped
         """
         mines.insert(0, PhotonMine(self.x, self.y))
         self.drop_cooldown = randrange(10, 20)
-        self.last_drop = time()
+        self.last_drop = clock.time()
+        return mines[0]
 
-    def shoot(self, player: Player, lasers: list[Laser]):
+    def shoot(self, player: Player, lasers: list[Laser]) -> Laser:
         """
         Shoot a laser towards the player
 
         :param player: Player, The player to shoot at
         :param lasers: list[Laser]: The lasers already in the game
+        :return: Laser, The laser shot
         """
         direction = Vector(player.x - self.x, player.y - self.y)
         lasers.append(Laser(self.x, self.y, direction))
         self.shoot_cooldown = randrange(3, 8)
-        self.last_shoot = time()
+        self.last_shoot = clock.time()
+        return lasers[-1]
 
     def update(self, dt):
         self.set_image(
             "DroidShip.png"
-            if time() - self.init < 2 and time() % 1 < 0.5
+            if clock.time() - self.init < 2 and clock.time() % 1 < 0.5
             else "Transformation1.png"
-            if time() - self.init < 2
+            if clock.time() - self.init < 2
             else "CommandShip.png"
         )
         super().update(dt)
@@ -330,8 +348,8 @@ class DeathShip(Ship):
         direction = Vector(random(), random())
         super().__init__(x, y, "DeathShip.png", direction, 0.2, 2000, level)
         self.drop_cooldown = randrange(10, 20)
-        self.last_drop = time()
-        self.init = time()
+        self.last_drop = clock.time()
+        self.init = clock.time()
 
     def can_drop(self) -> bool:
         """
@@ -339,17 +357,19 @@ class DeathShip(Ship):
 
         :return: bool, Whether the ship can drop a mine or not
         """
-        return self.alive and time() - self.last_drop >= self.drop_cooldown
+        return self.alive and clock.time() - self.last_drop >= self.drop_cooldown
 
-    def drop_mine(self, mines: list[Mine]):
+    def drop_mine(self, mines: list[Mine]) -> Mine:
         """
         Drop a Photon or Vapor Mine at the ship's position
 
         :param enemies: list[Mine], The mines already in the game
+        :return: Mine, The mine dropped
         """
         mines.insert(0, choice((VaporMine, PhotonMine))(self.x, self.y))
         self.drop_cooldown = randrange(10, 20)
-        self.last_drop = time()
+        self.last_drop = clock.time()
+        return mines[0]
 
     def turn(self):
         pass
@@ -357,9 +377,9 @@ class DeathShip(Ship):
     def update(self, dt):
         self.set_image(
             "CommandShip.png"
-            if time() - self.init < 2 and time() % 1 < 0.5
+            if clock.time() - self.init < 2 and clock.time() % 1 < 0.5
             else "Transformation2.png"
-            if time() - self.init < 2
+            if clock.time() - self.init < 2
             else "DeathShip.png"
         )
         super().update(dt)
@@ -0,0 +1,122 @@
+from math import ceil
+from src.vector import Vector
+from src.const import WIN_WIDTH, WIN_HEIGHT, CEN_X, CEN_Y, PAN_WIDTH, PAN_HEIGHT, PATROL_CELL
+
+try:
+    import numpy
+except Exception:
+    numpy = None
+
+# Directions ships turn to, by code (0 keeps the current direction)
+DIRECTIONS = [None, Vector(0, 1), Vector(-1, 0), Vector(0, -1), Vector(1, 0)]
+
+LEFT, RIGHT = CEN_X - PAN_WIDTH / 2, CEN_X + PAN_WIDTH / 2
+TOP, BOTTOM = CEN_Y - PAN_HEIGHT / 2, CEN_Y + PAN_HEIGHT / 2
+
+
+def region(x: float, y: float, distance: int) -> int:
+    """
+    Get the direction a ship patrolling around the panel turns to at a given position
+
+    :param x: float, The x coordinate of the ship
+    :param y: float, The y coordinate of the ship
+    :param distance: int, How far from the panel the ship patrols
+    :return: int, The code of the direction (0 to keep the current one)
+    """
+    code = 0
+    # top left
+    if (x + distance < LEFT and y < TOP) or (x < LEFT and TOP < y < BOTTOM + distance):
+        code = 1
+    # top right
+    if (x > RIGHT and y + distance < TOP) or (LEFT - distance < x < RIGHT and y < TOP):
+        code = 2
+    # bottom right
+    if (x - distance > RIGHT and y > BOTTOM) or (x > RIGHT and TOP - distance < y < BOTTOM):
+        code = 3
+    # bottom left
+    if (x < LEFT and y - distance > BOTTOM) or (LEFT < x < RIGHT + distance and y > BOTTOM):
+        code = 4
+    return code
+
+
+class Patrol:
+    """
+    The Patrol keeps where ships turn around the panel, in a grid of cells for each patrol distance
+    Turning is then a single read, and the directions of many ships can be read at once
+    Grids are computed the first time a distance is used
+    """
+
+    def __init__(self):
+        self.columns = ceil(WIN_WIDTH / PATROL_CELL)
+        self.rows = ceil(WIN_HEIGHT / PATROL_CELL)
+        self.grids: dict[int, bytearray] = {}
+        # Every grid in a single array, indexed by distance / PATROL_CELL, to read them with NumPy
+        self.array = None
+        self.stacked: set[int] = set()
+
+    def grid(self, distance: int) -> bytearray:
+        """
+        Get the grid of directions for a patrol distance
+
+        :param distance: int, How far from the panel ships patrol, a multiple of PATROL_CELL
+        :return: bytearray, The code of the direction in each cell, row by row
+        """
+        if distance not in self.grids:
+            half = PATROL_CELL / 2
+            self.grids[distance] = bytearray(
+                region(column * PATROL_CELL + half, row * PATROL_CELL + half, distance)
+                for row in range(self.rows)
+                for column in range(self.columns)
+            )
+        return self.grids[distance]
+
+    def cell(self, x: float, y: float) -> int:
+        """
+        Get the index of the cell at a position
+
+        :param x: float, The x coordinate
+        :param y: float, The y coordinate
+        :return: int, The index of the cell (positions out of the window use the closest cell)
+        """
+        column = min(max(int(x // PATROL_CELL), 0), self.columns - 1)
+        row = min(max(int(y // PATROL_CELL), 0), self.rows - 1)
+        return row * self.columns + column
+
+    def direction(self, x: float, y: float, distance: int) -> Vector:
+        """
+        Get the direction a ship turns to
+
+        :param x: float, The x coordinate of the ship
+        :param y: float, The y coordinate of the ship
+        :param distance: int, How far from the panel the ship patrols
+        :return: Vector, The direction (None to keep the current one), it must not be modified
+        """
+        return DIRECTIONS[self.grid(distance)[self.cell(x, y)]]
+
+    def directions(self, xs, ys, distances):
+        """
+        Get the directions many ships turn to at once, with NumPy when it is available
+
+        :param xs: Sequence[float], The x coordinates of the ships
+        :param ys: Sequence[float], The y coordinates of the ships
+        :param distances: Sequence[int], How far from the panel each ship patrols
+        :return: list[int] | numpy.ndarray, The codes of the directions, indexes of DIRECTIONS
+        """
+        if numpy is None:
+            return [self.grid(distance)[self.cell(x, y)] for x, y, distance in zip(xs, ys, distances)]
+
+        distances = numpy.asarray(distances, dtype=int)
+        needed = set(distances.tolist())
+        if not needed <= self.stacked:
+            for distance in needed:
+                self.grid(distance)
+            self.array = numpy.zeros((max(self.grids) // PATROL_CELL + 1, self.rows * self.columns), numpy.uint8)
+            for distance, grid in self.grids.items():
+                self.array[distance // PATROL_CELL] = numpy.frombuffer(grid, numpy.uint8)
+            self.stacked = set(self.grids)
+        columns = numpy.clip(numpy.asarray(xs) // PATROL_CELL, 0, self.columns - 1).astype(int)
+        rows = numpy.clip(numpy.asarray(ys) // PATROL_CELL, 0, self.rows - 1).astype(int)
+        return self.array[distances // PATROL_CELL, rows * self.columns + columns]
+
+
+patrol = Patrol()
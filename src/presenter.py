@@ -0,0 +1,78 @@
+import pygame
+import threading
+from src.governor import governor
+
+
+class Presenter:
+    """
+    The Presenter scales finished frames to the size of the window from its own thread,
+    so the next frame can be computed meanwhile (pygame releases the GIL while scaling)
+    The display itself is only ever touched from the main thread, which shows each scaled frame
+    before handing over the next one, so frames are displayed one frame late
+    A frame must not be drawn on again until the next one has been handed over
+    It is experimental: it has only been measured on a single core, where it was 35% slower
+    """
+
+    def __init__(self):
+        self.frame = None
+        self.size = None
+        self.scaled = None
+        self.running = True
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self.run, name="presenter", daemon=True)
+        self.thread.start()
+
+    def present(self, frame: pygame.Surface, display: pygame.Surface):
+        """
+        Display the previously scaled frame and hand the next one over to be scaled
+
+        :param frame: pygame.Surface, The frame to scale
+        :param display: pygame.Surface, The surface of the window
+        """
+        self.wait()
+        if self.scaled is not None and self.scaled.get_size() == display.get_size():
+            display.blit(self.scaled, (0, 0))
+            pygame.display.update()
+        with self.condition:
+            self.frame = frame
+            self.size = display.get_size()
+            self.condition.notify_all()
+
+    def wait(self):
+        """
+        Wait for the current frame to be scaled
+        """
+        with self.condition:
+            while self.frame is not None:
+                self.condition.wait()
+
+    def run(self):
+        """
+        Scale frames as they come
+        """
+        while True:
+            with self.condition:
+                while self.frame is None and self.running:
+                    self.condition.wait()
+                if not self.running:
+                    return
+                frame, size = self.frame, self.size
+
+            if self.scaled is None or self.scaled.get_size() != size:
+                self.scaled = pygame.Surface(size, 0, frame)
+            scale = pygame.transform.smoothscale if governor.smooth else pygame.transform.scale
+            scale(frame, size, self.scaled)
+
+            with self.condition:
+                self.frame = None
+                self.condition.notify_all()
+
+    def stop(self):
+        """
+        Stop the presenter once the current frame is scaled
+        """
+        self.wait()
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        self.thread.join()
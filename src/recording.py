@@ -0,0 +1,261 @@
+import os
+import sys
+import struct
+import random
+from time import perf_counter, strftime
+from src.clock import clock
+from src.governor import governor
+from src.const import RECORDINGS
+
+MAGIC = b"OMGR"
+VERSION = 1
+DT = struct.Struct("<d")
+
+# Bits of the state of a tick, the quality level goes above them
+LEFT = 1
+RIGHT = 2
+THRUST = 4
+SHOOT = 8
+ACTED = 16
+PAUSED = 32
+LEVEL = 6
+
+
+def write_varint(buffer: bytearray, value: int):
+    """
+    Write a positive integer on as few bytes as needed, 7 bits at a time
+
+    :param buffer: bytearray, The buffer to write to
+    :param value: int, The integer
+    """
+    while value >= 0x80:
+        buffer.append(value & 0x7F | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def read_varint(view: memoryview, offset: int) -> tuple[int, int]:
+    """
+    Read a positive integer written by write_varint
+
+    :param view: memoryview, The data to read from
+    :param offset: int, Where the integer starts
+    :return: tuple[int, int], The integer and where the next value starts
+    """
+    value = shift = 0
+    while True:
+        byte = view[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+class Recorder:
+    """
+    The Recorder writes down everything a game depends on, so it can be played again exactly:
+    the seed of the random generator, then for each tick the inputs, whether the game was paused,
+    the quality level (it changes the rotated images, so the collisions) and the time delta
+    Ticks are grouped in runs of identical ones, the time delta is only written when it changes
+
+    :param directory: str = RECORDINGS, Where to save the recordings
+    """
+
+    def __init__(self, directory: str = RECORDINGS):
+        self.directory = directory
+        self.buffer = None
+
+    @property
+    def recording(self) -> bool:
+        """
+        Check if a game is being recorded
+
+        :return: bool, Whether a game is being recorded or not
+        """
+        return self.buffer is not None
+
+    def begin(self, horde: bool):
+        """
+        Start recording a game, before anything random happens in it, a game not ended is dropped
+        The clock is simulated from then on, as the replay will be
+
+        :param horde: bool, Whether the game is played against hordes of enemies or not
+        """
+        seed = random.randrange(2**32)
+        random.seed(seed)
+        clock.simulate()
+        self.buffer = bytearray(MAGIC)
+        self.buffer.append(VERSION)
+        write_varint(self.buffer, seed)
+        write_varint(self.buffer, int(horde))
+        self.state = self.ticks = 0
+        self.run = None
+        self.dt = None
+        # Games can start within the same second, their seeds tell them apart
+        self.name = f"{strftime('%Y-%m-%d_%H-%M-%S')}_{seed}"
+
+    def pause(self):
+        """
+        Note that the game was paused since the last tick
+        """
+        if self.recording:
+            self.state |= PAUSED
+
+    def flush(self):
+        """
+        Write the current run of ticks
+        """
+        state, dt = self.run
+        changed = dt != self.dt
+        write_varint(self.buffer, self.ticks << 1 | changed)
+        write_varint(self.buffer, state)
+        if changed:
+            # Written exactly, a rounded time delta would make the replay drift
+            self.buffer += DT.pack(dt)
+            self.dt = dt
+
+    def tick(self, dt: float, inputs: tuple[str, bool, bool] = None):
+        """
+        Note a tick of the engine, with the inputs the player acts with at its start
+
+        :param dt: float, The time delta of the tick
+        :param inputs: tuple[str, bool, bool] = None, Where the player rotates, whether they thrust and shoot
+        (None when they don't act)
+        """
+        if not self.recording:
+            return
+        state = self.state
+        if inputs is not None:
+            rotating, thrust, shoot = inputs
+            state |= ACTED | (LEFT if rotating == "left" else RIGHT if rotating == "right" else 0)
+            state |= (THRUST if thrust else 0) | (SHOOT if shoot else 0)
+        run = (state | governor.level << LEVEL, dt)
+        if run != self.run:
+            if self.run is not None:
+                self.flush()
+            self.run = run
+            self.ticks = 0
+        self.ticks += 1
+        self.state = 0
+
+    def end(self, score: int, level: int) -> str:
+        """
+        Stop recording the game and save it, with its result so replays can be checked
+
+        :param score: int, The final score
+        :param level: int, The final level
+        :return: str, The path of the recording
+        """
+        if not self.recording:
+            return None
+        if self.run is not None:
+            self.flush()
+        # An empty run ends the ticks
+        write_varint(self.buffer, 0)
+        write_varint(self.buffer, score)
+        write_varint(self.buffer, level)
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{self.name}.omr")
+        with open(path, "wb") as file:
+            file.write(self.buffer)
+        self.buffer = None
+        print(f"Game recorded in {path}")
+        return path
+
+
+class Recording:
+    """
+    A Recording read from a file, it is parsed as it is played, without copying it
+
+    :param path: str, The path of the recording
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as file:
+            self.view = memoryview(file.read())
+        if self.view[:4] != MAGIC or self.view[4] != VERSION:
+            raise ValueError(f"'{path}' is not a recording")
+        self.seed, offset = read_varint(self.view, 5)
+        horde, self.start = read_varint(self.view, offset)
+        self.horde = bool(horde)
+        self.score = self.level = None
+
+    def ticks(self):
+        """
+        Go through the ticks of the recording, its result is read once they are over
+
+        :return: Iterator[tuple[int, float]], The state and time delta of each tick
+        """
+        view = self.view
+        offset = self.start
+        dt = None
+        while True:
+            header, offset = read_varint(view, offset)
+            if header == 0:
+                break
+            state, offset = read_varint(view, offset)
+            if header & 1:
+                (dt,) = DT.unpack_from(view, offset)
+                offset += DT.size
+            for i in range(header >> 1):
+                yield state, dt
+        self.score, offset = read_varint(view, offset)
+        self.level, offset = read_varint(view, offset)
+
+
+def replay(path: str) -> dict:
+    """
+    Play a recorded game again without a window, as fast as possible
+
+    :param path: str, The path of the recording
+    :return: dict, The summary of the replay
+    """
+    from src.farm import headless
+
+    recording = Recording(path)
+    # The AI had no time budget while recording either
+    engine = headless(recording.horde)
+    random.seed(recording.seed)
+    clock.simulate()
+    engine.start()
+
+    start = perf_counter()
+    ticks, time = 0, 0
+    for state, dt in recording.ticks():
+        governor.level = state >> LEVEL
+        if state & PAUSED:
+            engine.pause()
+        if state & ACTED:
+            rotating = "left" if state & LEFT else "right" if state & RIGHT else ""
+            engine.act(rotating, bool(state & THRUST), bool(state & SHOOT))
+        if state & PAUSED:
+            engine.unpause()
+            engine.reset()
+        engine.update(dt)
+        ticks += 1
+        time += dt
+    elapsed = perf_counter() - start
+
+    return {
+        "ticks": ticks,
+        "time": time / 1000,
+        "elapsed": elapsed,
+        "score": engine.score,
+        "level": engine.level,
+        "matches": (engine.score, engine.level) == (recording.score, recording.level),
+        "costs": engine.read_costs(ticks),
+    }
+
+
+if __name__ == "__main__":
+    # python -m src.recording path
+    summary = replay(sys.argv[1])
+    print(
+        f"{summary['ticks']} ticks ({summary['time']:.1f} s of game) replayed in {summary['elapsed']:.2f} s "
+        f"({summary['ticks'] / summary['elapsed']:.0f} ticks/s)"
+    )
+    print(f"Score {summary['score']}, level {summary['level']}, {'as' if summary['matches'] else 'NOT as'} recorded")
+    for name, cost in summary["costs"].items():
+        print(f"    {name}: {cost:.3f} ms per tick")
@@ -0,0 +1,85 @@
+import os
+import pygame
+from weakref import WeakKeyDictionary
+from src.objects.base import Object, Entity
+from src.objects.graphics import RenderList
+from src.const import WIN_WIDTH, WIN_HEIGHT
+
+try:
+    from pygame._sdl2 import video
+except Exception:
+    video = None
+
+
+class Renderer:
+    """
+    The Renderer displays frames through SDL's renderer instead of scaling them on the CPU
+    Images are uploaded once as textures, then moved, rotated and scaled by the renderer (on the GPU if there is one)
+    Entities drawn by the engine are textures, the rest of the frame is still drawn on a surface and uploaded each frame
+
+    :param software: bool = False, Whether to use SDL's software renderer or not, to run without a GPU
+    """
+
+    def __init__(self, software: bool = False):
+        if video is None:
+            raise RuntimeError("pygame._sdl2 is not available")
+        # Linear filtering when scaling, like smoothscale
+        os.environ.setdefault("SDL_RENDER_SCALE_QUALITY", "1")
+        self.window = video.Window("Omega Race", (WIN_WIDTH, WIN_HEIGHT), resizable=True)
+        self.window.set_icon(pygame.image.load("assets/images/Icon.png"))
+        self.renderer = video.Renderer(self.window, accelerated=0 if software else -1)
+        # Everything is drawn at the size of the game and scaled to the window by the renderer
+        self.renderer.logical_size = (WIN_WIDTH, WIN_HEIGHT)
+        self.frame = video.Texture(self.renderer, (WIN_WIDTH, WIN_HEIGHT), streaming=True)
+        self.frame.blend_mode = 0
+        # Textures are dropped with the images they were made from
+        self.textures: WeakKeyDictionary[pygame.Surface, video.Texture] = WeakKeyDictionary()
+
+    def texture(self, image: pygame.Surface) -> "video.Texture":
+        """
+        Get the texture of an image, uploading it the first time
+        The image must not be modified afterwards, or the texture won't follow
+
+        :param image: pygame.Surface, The image
+        :return: video.Texture, The texture
+        """
+        if image not in self.textures:
+            self.textures[image] = video.Texture.from_surface(self.renderer, image)
+        return self.textures[image]
+
+    def draw(self, obj: Object, alpha: float = 1):
+        """
+        Draw an object, entities are rotated by the renderer
+
+        :param obj: Object, The object to draw
+        :param alpha: float = 1, How far entities are from their previous position (0) to the current one (1)
+        """
+        if isinstance(obj, Entity):
+            # Placed from their position, so their rotated image is never needed
+            x, y = obj.previous
+            center = (x + (obj.x - x) * alpha, y + (obj.y - y) * alpha)
+            dstrect = obj.base_image.get_rect(center=center)
+            # The renderer turns clockwise, pygame.transform.rotate doesn't
+            self.texture(obj.base_image).draw(dstrect=dstrect, angle=-obj.angle)
+        else:
+            self.texture(obj.image).draw(dstrect=obj.rect)
+
+    def present(self, frame: pygame.Surface, render: RenderList = None, alpha: float = 1):
+        """
+        Display a frame, with the objects of a render list on top of it
+
+        :param frame: pygame.Surface, The frame to display
+        :param render: RenderList = None, The objects to draw as textures
+        :param alpha: float = 1, How far entities are from their previous position (0) to the current one (1)
+        """
+        self.frame.update(frame)
+        self.renderer.clear()
+        self.frame.draw()
+        if render is not None:
+            for i, layer in enumerate(render.layers):
+                for obj in layer:
+                    self.draw(obj, alpha if i in render.moving else 1)
+                for batch in render.batches[i]:
+                    for image, position in batch.sequence():
+                        self.texture(image).draw(dstrect=image.get_rect(topleft=position))
+        self.renderer.present()
@@ -0,0 +1,77 @@
+from time import perf_counter
+from math import hypot
+from src.objects.base import Entity
+from src.objects.sprites import DroidShip
+from src.sight import sight
+from src.const import AI_DISTANCE, AI_SLOTS, AI_BUDGET
+
+
+class Scheduler:
+    """
+    The Scheduler spreads the thinking of ships across ticks, while they keep moving every tick
+    Ships close to the player think every tick, the others less often the further they are,
+    and thinking stops for the tick once the time budget is spent, the rest waits for the next one
+
+    :param budget: float = AI_BUDGET, The time (ms) ships can spend thinking in a tick
+    """
+
+    def __init__(self, budget: float = AI_BUDGET):
+        self.budget = budget
+        # Ships waiting for each of the next ticks, in a ring
+        self.slots: list[list[Entity]] = [[] for i in range(AI_SLOTS)]
+        self.tick = 0
+        self.added = 0
+
+    def __len__(self) -> int:
+        return sum(len(slot) for slot in self.slots)
+
+    def add(self, ship: Entity):
+        """
+        Schedule a ship, ships added together are spread across the next ticks
+
+        :param ship: Entity (Ship), The ship to schedule
+        """
+        self.slots[(self.tick + 1 + self.added % AI_SLOTS) % AI_SLOTS].append(ship)
+        self.added += 1
+
+    def clear(self):
+        """
+        Forget every ship and start the schedule over, so a game doesn't depend on the ones before it
+        """
+        for slot in self.slots:
+            slot.clear()
+        self.tick = 0
+        self.added = 0
+
+    def period(self, ship: Entity, player: Entity) -> int:
+        """
+        Get the number of ticks until a ship thinks again
+
+        :param ship: Entity (Ship), The ship
+        :param player: Entity (Player), The player
+        :return: int, The number of ticks
+        """
+        return min(1 + int(hypot(ship.x - player.x, ship.y - player.y) / AI_DISTANCE), AI_SLOTS - 1)
+
+    def update(self, player: Entity):
+        """
+        Make the ships of the current tick think, dead ships are dropped
+
+        :param player: Entity (Player), The player
+        """
+        self.tick += 1
+        current = self.tick % AI_SLOTS
+        ships, self.slots[current] = self.slots[current], []
+        # What the droids see is checked all at once, the other ships never look
+        sight.batch([ship for ship in ships if ship.alive and isinstance(ship, DroidShip)], player)
+        start = perf_counter()
+        for i, ship in enumerate(ships):
+            if (perf_counter() - start) * 1000 >= self.budget:
+                # Out of time, the others think first next tick, before the ships of that tick
+                following = (current + 1) % AI_SLOTS
+                self.slots[following] = [other for other in ships[i:] if other.alive] + self.slots[following]
+                break
+            if not ship.alive:
+                continue
+            ship.think(player)
+            self.slots[(current + self.period(ship, player)) % AI_SLOTS].append(ship)
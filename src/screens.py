@@ -1,11 +1,12 @@
 import pygame
 from time import time
 from src.objects.base import Object, Text
-from src.objects.graphics import Border
+from src.objects.graphics import Border, Composite
 from src.config import Config
 from src.data import Data
 from src.mixer import Mixer
 from src.vector import Vector
+from src.assets import assets
 from src.const import (
     WIN_WIDTH,
     WIN_HEIGHT,
@@ -23,6 +24,7 @@ from src.const import (
     GREY,
     RED,
     PLAYER_COLORS,
+    SCORES_ROWS,
 )
 
 
@@ -39,6 +41,9 @@ class Screen:
         self.mixer = mixer
 
         self.objects: list[Object] = []
+        # Objects that never change, drawn from a single cached image
+        self.statics: list[Object] = []
+        self.composite = None
         self.choices: list[tuple[Object, int]] = []
         self.reset()
 
@@ -118,6 +123,10 @@ class Screen:
 
         :param surface: pygame.Surface, The surface to draw the screen on
         """
+        if len(self.statics) > 0:
+            if self.composite is None:
+                self.composite = Composite(self.statics)
+            self.composite.draw(surface)
         for obj in self.objects:
             obj.draw(surface)
 
@@ -160,7 +169,8 @@ class Welcome(Screen):
         self.input_text = Text("Enter your name:", CEN_X, CEN_Y, 40)
         self.input = Text(self.config.name, CEN_X, CEN_Y + 50, 40, self.config.color)
 
-        self.objects = [self.title, self.input_text, self.input]
+        self.statics = [self.title, self.input_text]
+        self.objects = [self.input]
         self.choices = [(self.input, HOME)]
 
     def get_choice(self) -> int:
@@ -209,7 +219,8 @@ class Home(Screen):
         self.settings = Text("Settings", CEN_X, CEN_Y + 130, 40)
         self.exit = Text("Exit", CEN_X, CEN_Y + 230, 40)
 
-        self.objects = [self.title, self.play, self.scores, self.settings, self.exit]
+        self.statics = [self.title]
+        self.objects = [self.play, self.scores, self.settings, self.exit]
         self.choices = [
             (self.play, PLAY),
             (self.scores, SCORES),
@@ -231,7 +242,7 @@ class Home(Screen):
 
 class Scores(Screen):
     """
-    The scores of the game
+    The scores of the game, only the visible window of scores is fetched and rendered
 
     :param config: Config, The game configuration
     :param mixer: Mixer, The game mixer for music and sounds
@@ -243,13 +254,125 @@ class Scores(Screen):
         self.data = data
 
         self.title = Text("Scores", CEN_X, WIN_HEIGHT / 5, 90)
-        self.names = [Text("", 150, 253 + i * 40, anchor="left") for i in range(10)]
-        self.scores = [Text("", 550, 253 + i * 40, anchor="right") for i in range(10)]
-        self.levels = [Text("", 800, 253 + i * 40, anchor="right") for i in range(10)]
+        self.filter = Text("ALL", WIN_WIDTH / 5, WIN_HEIGHT - 100, 40)
         self.home = Text("HOME", WIN_WIDTH * 4 / 5, WIN_HEIGHT - 100, 40)
 
-        self.objects = [self.title, *self.names, *self.scores, *self.levels, self.home]
-        self.choices = [(self.home, HOME)]
+        self.font = assets.font("font.ttf", 25)
+        # Rendered rows, reused as long as their content doesn't change
+        self.cache: dict[tuple, pygame.Surface] = {}
+        self.rows: list[pygame.Surface] = []
+        self.offset = 0
+        self.mine = False
+        self.shown = None
+
+        self.statics = [self.title]
+        self.objects = [self.filter, self.home]
+        self.choices = [(self.filter, None), (self.home, HOME)]
+
+    def scroll(self, rows: int):
+        """
+        Scroll through the scores
+
+        :param rows: int, The number of rows to scroll by (negative to go up)
+        """
+        total = self.data.total(self.config.name if self.mine else None)
+        self.offset = min(max(self.offset + rows, 0), max(total - SCORES_ROWS, 0))
+
+    def toggle(self):
+        """
+        Switch between all the scores and the user's scores
+        """
+        self.mine = not self.mine
+        self.offset = 0
+        self.last_change = time()
+
+    def handle_event(self, event: pygame.event.Event):
+        """
+        Handle a single user event
+
+        :param event: pygame.event.Event, The event that happened
+        """
+        if event.type == pygame.MOUSEWHEEL:
+            self.scroll(-event.y)
+
+    def handle_keys(self):
+        """
+        Handle user inputs in the scores
+        """
+        if self.config.mouse or not self.can_change():
+            return
+
+        keys = pygame.key.get_pressed()
+        if keys[pygame.K_RETURN]:
+            if self.selection == 0:
+                self.toggle()
+            else:
+                self.choice = self.get_choice()
+        if keys[self.config.keys["LEFT"]] and not keys[self.config.keys["RIGHT"]]:
+            self.selection = (self.selection - 1) % len(self.choices)
+            self.last_change = time()
+        if keys[self.config.keys["RIGHT"]] and not keys[self.config.keys["LEFT"]]:
+            self.selection = (self.selection + 1) % len(self.choices)
+            self.last_change = time()
+        if keys[self.config.keys["UP"]] and not keys[self.config.keys["DOWN"]]:
+            self.scroll(-1)
+            self.last_change = time() - 0.15
+        if keys[self.config.keys["DOWN"]] and not keys[self.config.keys["UP"]]:
+            self.scroll(1)
+            self.last_change = time() - 0.15
+        if keys[pygame.K_PAGEUP]:
+            self.scroll(-SCORES_ROWS)
+            self.last_change = time()
+        if keys[pygame.K_PAGEDOWN]:
+            self.scroll(SCORES_ROWS)
+            self.last_change = time()
+
+    def handle_mouse(self):
+        """
+        Handle mouse use in the scores
+        """
+        if not self.config.mouse or not self.can_change():
+            return
+
+        buttons = pygame.mouse.get_pressed()
+        if buttons[0] and self.selection == 0:
+            self.toggle()
+            return
+        super().handle_mouse()
+
+    def render_row(self, rank: int, doc: dict) -> pygame.Surface:
+        """
+        Render a row of the scores, or get it from the cache
+
+        :param rank: int, The rank of the score
+        :param doc: dict, The score document (None for an empty row)
+        :return: pygame.Surface, The rendered row
+        """
+        key = (rank, doc["name"], doc["score"], doc["level"]) if doc is not None else (rank,)
+        if key in self.cache:
+            return self.cache[key]
+        if len(self.cache) > 16 * SCORES_ROWS:
+            self.cache.clear()
+
+        name = f"{rank}. {doc['name']}" if doc is not None else f"{rank}. -----"
+        score = f"{doc['score']}" if doc is not None else "-----"
+        level = f"Level {doc['level']}" if doc is not None else "--"
+        row = pygame.Surface((650, 40), pygame.SRCALPHA)
+        images = [self.font.render(content, True, WHITE) for content in (name, score, level)]
+        row.blit(images[0], images[0].get_rect(midleft=(0, 20)))
+        row.blit(images[1], images[1].get_rect(midright=(400, 20)))
+        row.blit(images[2], images[2].get_rect(midright=(650, 20)))
+        self.cache[key] = row.convert_alpha()
+        return self.cache[key]
+
+    def draw(self, surface: pygame.Surface):
+        """
+        Draw the scores on the given surface
+
+        :param surface: pygame.Surface, The surface to draw the scores on
+        """
+        super().draw(surface)
+        surface.blits([(row, (150, 233 + i * 40)) for i, row in enumerate(self.rows)], False)
 
     def update(self, dt: int):
         """
@@ -257,17 +380,20 @@ class Scores(Screen):
 
         :param dt: int, The time delta between frames
         """
-        for i in range(10):
-            if i < len(self.data.scores):
-                self.names[i].update(content=f"{i+1}. {self.data.scores[i]['name']}")
-                self.scores[i].update(content=f"{self.data.scores[i]['score']}")
-                self.levels[i].update(content=f"Level {self.data.scores[i]['level']}")
-            else:
-                self.names[i].update(content=f"{i+1}. -----")
-                self.scores[i].update(content="-----")
-                self.levels[i].update(content="--")
-
-        self.update_color(self.home, 0)
+        # The window is only asked for again when something changed
+        name = self.config.name if self.mine else None
+        shown = (self.offset, name, self.data.version)
+        if shown != self.shown:
+            self.shown = shown
+            window = self.data.window(self.offset, SCORES_ROWS, name)
+            self.rows = [
+                self.render_row(self.offset + i + 1, window[i] if i < len(window) else None)
+                for i in range(SCORES_ROWS)
+            ]
+            self.filter.update(content="MINE" if self.mine else "ALL")
+
+        self.update_color(self.filter, 0)
+        self.update_color(self.home, 1)
 
 
 class Settings(Screen):
@@ -324,6 +450,19 @@ class Settings(Screen):
 
         self.popup_open = False
 
+        self.statics = [
+            self.title,
+            self.up_text,
+            self.down_text,
+            self.left_text,
+            self.right_text,
+            self.shoot_text,
+            self.pause_text,
+            self.mouse_text,
+            self.volume_text,
+            self.fps_text,
+            self.color_text,
+        ]
         self.choices = [
             (self.up_key, None),
             (self.down_key, None),
@@ -470,26 +609,15 @@ class Settings(Screen):
         self.update_color(self.home, 10)
 
         self.objects = [
-            self.title,
-            self.up_text,
             self.up_key,
-            self.down_text,
             self.down_key,
-            self.left_text,
             self.left_key,
-            self.right_text,
             self.right_key,
-            self.shoot_text,
             self.shoot_key,
-            self.pause_text,
             self.pause_key,
-            self.mouse_text,
             self.mouse,
-            self.volume_text,
             self.volume,
-            self.fps_text,
             self.fps,
-            self.color_text,
             self.color_arrows,
             self.color_circle,
             self.home,
@@ -519,7 +647,8 @@ class Pause(Screen):
             Border(CEN_X, CEN_Y + PAN_HEIGHT / 2, PAN_WIDTH + 3, 3, Vector(0, 0), True),
         ]
 
-        self.objects = [self.title, self.play, self.home, *self.borders]
+        self.statics = [self.title, *self.borders]
+        self.objects = [self.play, self.home]
         self.choices = [(self.play, PLAY), (self.home, HOME)]
 
     def handle_event(self, event: pygame.event.Event):
@@ -580,7 +709,8 @@ class GameOver(Screen):
             Border(CEN_X, CEN_Y + PAN_HEIGHT / 2, PAN_WIDTH + 3, 3, Vector(0, 0), True),
         ]
 
-        self.objects = [self.title, self.play, self.home, *self.borders]
+        self.statics = [self.title, *self.borders]
+        self.objects = [self.play, self.home]
         self.choices = [(self.play, PLAY), (self.home, HOME)]
 
     def handle_keys(self):
@@ -0,0 +1,94 @@
+import pygame
+from src.objects.base import Entity
+from src.const import CEN_X, CEN_Y, PAN_WIDTH, PAN_HEIGHT, SIGHT_BATCH, SIGHT_MARGIN
+
+try:
+    import numpy
+except Exception:
+    numpy = None
+
+
+class Sight:
+    """
+    The Sight tells whether ships can see an entity, the panel being the only thing in the way
+    Answers are kept until the sight is cleared, at each simulation step, so asking again costs nothing
+    Many ships can be checked in a single pass with NumPy when it is available
+    """
+
+    def __init__(self):
+        panel_x, panel_y = CEN_X - PAN_WIDTH / 2, CEN_Y - PAN_HEIGHT / 2
+        # The panel with a margin, ships can't see through
+        self.panel = pygame.Rect(panel_x - 10, panel_y - 10, PAN_WIDTH + 20, PAN_HEIGHT + 20)
+        self.cache: dict[tuple[Entity, Entity], bool] = {}
+
+    def clear(self):
+        """
+        Forget every answer, entities moved
+        """
+        self.cache.clear()
+
+    def visible(self, ship: Entity, entity: Entity) -> bool:
+        """
+        Check if a ship can see an entity
+
+        :param ship: Entity (Ship), The ship looking
+        :param entity: Entity, The entity looked at
+        :return: bool, Whether the ship can see the entity or not
+        """
+        key = (ship, entity)
+        if key not in self.cache:
+            self.cache[key] = ship.alive and len(self.panel.clipline(ship.x, ship.y, entity.x, entity.y)) == 0
+        return self.cache[key]
+
+    def crossing(self, xs: "numpy.ndarray", ys: "numpy.ndarray", x: int, y: int, margin: int) -> "numpy.ndarray":
+        """
+        Check which segments cross the panel grown by a margin, with the slabs of the panel (pixels are inclusive)
+
+        :param xs: numpy.ndarray, The x coordinates of the starts of the segments
+        :param ys: numpy.ndarray, The y coordinates of the starts of the segments
+        :param x: int, The x coordinate of the end of the segments
+        :param y: int, The y coordinate of the end of the segments
+        :param margin: int, How much to grow the panel by on each side (negative to shrink it)
+        :return: numpy.ndarray, Whether each segment crosses the panel or not
+        """
+        t_min, t_max = numpy.zeros(len(xs)), numpy.ones(len(xs))
+        for starts, delta, low, high in (
+            (xs, x - xs, self.panel.left - margin, self.panel.right - 1 + margin),
+            (ys, y - ys, self.panel.top - margin, self.panel.bottom - 1 + margin),
+        ):
+            with numpy.errstate(divide="ignore", invalid="ignore"):
+                t1, t2 = (low - starts) / delta, (high - starts) / delta
+            # Segments parallel to a slab are either inside it all along or never
+            flat = delta == 0
+            inside = (low <= starts) & (starts <= high)
+            t1 = numpy.where(flat, numpy.where(inside, -numpy.inf, numpy.inf), t1)
+            t2 = numpy.where(flat, numpy.inf, t2)
+            t_min = numpy.maximum(t_min, numpy.minimum(t1, t2))
+            t_max = numpy.minimum(t_max, numpy.maximum(t1, t2))
+        return t_min <= t_max
+
+    def batch(self, ships: list[Entity], entity: Entity):
+        """
+        Check if many ships can see an entity at once, the answers are then kept
+        Without NumPy, or for a few ships, nothing happens and each ship is checked when asked
+        Coordinates are truncated as clipline does, but its clipping rounds too,
+        so ships whose sight passes within SIGHT_MARGIN pixels of the panel are still checked when asked
+
+        :param ships: list[Entity] (list[Ship]), The ships looking
+        :param entity: Entity, The entity looked at
+        """
+        if numpy is None or len(ships) < SIGHT_BATCH:
+            return
+        ships = [ship for ship in ships if (ship, entity) not in self.cache]
+
+        xs = numpy.trunc(numpy.fromiter((ship.x for ship in ships), float, len(ships)))
+        ys = numpy.trunc(numpy.fromiter((ship.y for ship in ships), float, len(ships)))
+        alive = numpy.fromiter((ship.alive for ship in ships), bool, len(ships))
+        x, y = int(entity.x), int(entity.y)
+        hidden = self.crossing(xs, ys, x, y, -SIGHT_MARGIN)
+        visible = ~self.crossing(xs, ys, x, y, SIGHT_MARGIN)
+        for ship, live, seen, decided in zip(ships, alive.tolist(), visible.tolist(), (hidden | visible).tolist()):
+            if decided or not live:
+                self.cache[(ship, entity)] = live and seen
+
+sight = Sight()
@@ -1,5 +1,10 @@
 from __future__ import annotations
-from math import cos, sin, sqrt, atan2
+from math import cos, sin, sqrt, atan2, pi
+from src.const import ANGLES
+
+# Sines and cosines of every heading
+SINES = [sin(2 * pi * i / ANGLES) for i in range(ANGLES)]
+COSINES = [cos(2 * pi * i / ANGLES) for i in range(ANGLES)]
 
 
 class Vector:
@@ -96,6 +101,26 @@ class Vector:
         """
         return atan2(self.y, self.x)
 
+    @property
+    def heading(self) -> float:
+        """
+        Get the heading of the vector, going clockwise from the top of the screen
+
+        :return: float, The heading in [0, ANGLES)
+        """
+        return atan2(self.x, -self.y) * ANGLES / (2 * pi) % ANGLES
+
+    @staticmethod
+    def from_heading(heading: float) -> Vector:
+        """
+        Get the unit vector with the given heading, from the table of sines and cosines
+
+        :param heading: float, The heading, going clockwise from the top of the screen (ANGLES for a full turn)
+        :return: Vector, The unit vector
+        """
+        index = round(heading) % ANGLES
+        return Vector(SINES[index], -COSINES[index])
+
     def det(self, other: Vector) -> float:
         """
         Get the determinant of two vectors